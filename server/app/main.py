@@ -3,6 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.routes import chat, auth, download
 from app.db.session import engine
 from app.db import base
+from app.vector_db.bm25_index import get_bm25_index
+from app.vector_db.qdrant_client import check_embedding_provider
 
 app = FastAPI(title="ISRO SagarMegh AI Backend")
 
@@ -40,3 +42,11 @@ def root():
 @app.on_event("startup")
 def on_startup():
     base.Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add indexes introduced later
+    for table in base.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # Memory-map the BM25 index built by the scraper, if there is one
+    get_bm25_index()
+    # Refuse to serve queries embedded in a different space than the index
+    check_embedding_provider()
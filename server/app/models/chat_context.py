@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, Text, ForeignKey
+from sqlalchemy import Column, Integer, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 
 class ChatContext(Base):
     __tablename__ = "chat_context"
+    # Serves "latest N messages of a user" and keyset pagination on id
+    __table_args__ = (Index("ix_chat_context_user_id_id", "user_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class ChatSummary(Base):
+    __tablename__ = "chat_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+    )
+    summary = Column(Text, nullable=False)
+    # Last chat_context.id folded into the summary
+    last_message_id = Column(Integer, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    user = relationship("User", back_populates="chat_summary")
@@ -15,4 +15,7 @@ class User(Base):
     chat_history = relationship(
         "ChatContext", back_populates="user", cascade="all, delete-orphan"
     )
+    chat_summary = relationship(
+        "ChatSummary", back_populates="user", uselist=False, cascade="all, delete-orphan"
+    )
     downloads = relationship("DownloadJob", back_populates="user")
@@ -1,13 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
+from typing import Optional
 import jwt
 import os
 
 load_dotenv()
 
-from app.services.ai_chatbot import chatbot_response
-from app.schemas.chat import ChatRequest, ChatResponse, ChatHistoryResponse, ChatMessage
+from app.services.ai_chatbot import (
+    chatbot_response_async,
+    chatbot_response_stream,
+    chatbot_response_batch,
+)
+from app.services.conversation_memory import update_summary
+from app.services.semantic_cache import semantic_cache
+from app.services.hyde_cache import hyde_cache
+from app.services.query_router import router_stats
+from app.services.singleflight import singleflight_stats
+from app.services.embeddings import embedding_cache
+from app.schemas.chat import (
+    ChatRequest,
+    ChatResponse,
+    ChatHistoryResponse,
+    BatchChatRequest,
+    BatchChatResponse,
+)
 from app.db.session import get_db
 from app.models.user import User
 from app.models.chat_context import ChatContext
@@ -46,16 +65,24 @@ def get_current_user(
 
 
 @router.post("/", response_model=ChatResponse)
-def chat(
+async def chat(
     request: ChatRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
     Protected chatbot endpoint. Requires valid JWT.
-    Chat history is saved per user.
+    Chat history is saved per user; the rolling conversation summary is
+    refreshed in the background after the answer is sent.
     """
-    answer = chatbot_response(request.query, user_id=current_user.id, db=db)
+    answer = await chatbot_response_async(
+        request.query,
+        user_id=current_user.id,
+        db=db,
+        filters=request.filters.to_dict() if request.filters else None,
+    )
+    background_tasks.add_task(update_summary, current_user.id)
     return ChatResponse(
         user_id=current_user.id,
         query=request.query,
@@ -63,21 +90,108 @@ def chat(
     )
 
 
-@router.get("/history", response_model=ChatHistoryResponse)
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Streaming chatbot endpoint (Server-Sent Events). Requires valid JWT.
+    Sends retrieval metadata first, then answer tokens as they are generated.
+    """
+    return StreamingResponse(
+        chatbot_response_stream(
+            request.query,
+            user_id=current_user.id,
+            db=db,
+            filters=request.filters.to_dict() if request.filters else None,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(update_summary, current_user.id),
+    )
+
+
+@router.post("/batch", response_model=BatchChatResponse)
+async def chat_batch(
+    request: BatchChatRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Answer a list of queries in one request (evaluation sets, FAQ refresh).
+    Embeddings and vector searches are batched; per-query and per-stage
+    timings are returned alongside the answers. Queries are answered without
+    the user's conversation and only saved to it with `save_history`.
+    """
+    batch = await chatbot_response_batch(
+        request.queries,
+        user_id=current_user.id,
+        db=db,
+        top_k=request.top_k,
+        use_hyde=request.use_hyde,
+        filters=request.filters.to_dict() if request.filters else None,
+        save_history=request.save_history,
+    )
+    if request.save_history:
+        background_tasks.add_task(update_summary, current_user.id)
+    return BatchChatResponse(user_id=current_user.id, **batch)
+
+
+# The page is serialized directly with orjson (no response_model validation);
+# ChatHistoryResponse only documents its shape
+@router.get(
+    "/history",
+    response_class=ORJSONResponse,
+    responses={200: {"model": ChatHistoryResponse}},
+)
 def get_chat_history(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
+    before: Optional[int] = Query(
+        None, description="Return messages older than this message id (cursor)"
+    ),
+    limit: int = Query(50, ge=1, le=200, description="Number of messages to return"),
 ):
     """
-    Fetch full chat history for the current user.
+    Fetch a page of chat history for the current user.
+    Returns the `limit` most recent messages before the cursor, oldest first,
+    and `next_cursor` to request the previous page (null when exhausted).
     """
-    messages = (
-        db.query(ChatContext)
-        .filter(ChatContext.user_id == current_user.id)
-        .order_by(ChatContext.id.asc())
-        .all()
+    query = db.query(ChatContext.id, ChatContext.role, ChatContext.content).filter(
+        ChatContext.user_id == current_user.id
     )
+    if before is not None:
+        query = query.filter(ChatContext.id < before)
 
-    history = [ChatMessage(role=m.role, content=m.content) for m in messages]
+    rows = query.order_by(ChatContext.id.desc()).limit(limit + 1).all()
 
-    return ChatHistoryResponse(user_id=current_user.id, history=history)
+    has_more = len(rows) > limit
+    page = rows[:limit][::-1]
+
+    return ORJSONResponse(
+        {
+            "user_id": current_user.id,
+            "history": [
+                {"id": row.id, "role": row.role, "content": row.content}
+                for row in page
+            ],
+            "next_cursor": page[0].id if has_more else None,
+        }
+    )
+
+
+@router.get("/stats")
+def get_chat_stats(current_user: User = Depends(get_current_user)):
+    """
+    Runtime statistics of the chat pipeline caches.
+    """
+    return {
+        "semantic_cache": semantic_cache.stats(),
+        "hyde_cache": hyde_cache.stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "routes": router_stats.stats(),
+        "singleflight": singleflight_stats(),
+    }
@@ -1,9 +1,26 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+class SearchFilters(BaseModel):
+    """
+    Restrict retrieval to chunks whose metadata matches any listed value
+    of every given field.
+    """
+
+    mission: Optional[List[str]] = None  # e.g. ["INSAT-3DR"]
+    sensor: Optional[List[str]] = None  # e.g. ["IMAGER"]
+    product_level: Optional[List[str]] = None  # e.g. ["L2B"]
+    doc_type: Optional[List[str]] = None  # page, product, document, faq, news, tool, mission
+    domain_path: Optional[List[str]] = None  # e.g. ["/catalog"]
+
+    def to_dict(self) -> Optional[Dict[str, List[str]]]:
+        return self.model_dump(exclude_none=True) or None
 
 
 class ChatRequest(BaseModel):
     query: str
+    filters: Optional[SearchFilters] = None  # default: missions named in the query
 
 
 class ChatResponse(BaseModel):
@@ -13,6 +30,7 @@ class ChatResponse(BaseModel):
 
 
 class ChatMessage(BaseModel):
+    id: Optional[int] = None
     role: str  # "user" or "assistant"
     content: str
 
@@ -20,3 +38,25 @@ class ChatMessage(BaseModel):
 class ChatHistoryResponse(BaseModel):
     user_id: int
     history: List[ChatMessage]
+    next_cursor: Optional[int] = None  # pass as `before` to fetch older messages
+
+
+class BatchChatRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=100)
+    top_k: int = Field(5, ge=1, le=20)
+    use_hyde: bool = True
+    filters: Optional[SearchFilters] = None
+    save_history: bool = False  # add the answers to the user's chat history
+
+
+class BatchChatResult(BaseModel):
+    query: str
+    answer: str
+    route: str
+    timings: Dict[str, float]  # per-query milliseconds (hyde, llm)
+
+
+class BatchChatResponse(BaseModel):
+    user_id: int
+    results: List[BatchChatResult]
+    timings: Dict[str, float]  # batch-wide milliseconds per stage
@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from app.utils.storage import DATA_DIR
+from app.utils.urls import canonicalize_url
+
+load_dotenv()
+
+CRAWL_STATE_PATH = os.getenv("CRAWL_STATE_PATH", os.path.join(DATA_DIR, "crawl_state.sqlite3"))
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class CrawlState:
+    """
+    Persistent crawl progress and page validators (SQLite).
+
+    `pages` keeps, per canonical URL, the ETag / Last-Modified / content
+    hash of the last fetch, the links found on the page and whether that
+    version has been indexed. `frontier` and `visited` hold the progress of
+    the current crawl so an interrupted crawl resumes where it stopped.
+    """
+
+    def __init__(self, path: str = CRAWL_STATE_PATH):
+        self.path = path
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    links TEXT,
+                    indexed INTEGER NOT NULL DEFAULT 0,
+                    fetched_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS frontier (
+                    position INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    depth INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS visited (
+                    position INTEGER PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    unchanged INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def start(self, base_url: str, resume: bool = True) -> Optional[Dict]:
+        """
+        Begin a crawl of `base_url`. Returns the saved {"frontier",
+        "visited"} of an interrupted crawl of the same site when resuming,
+        otherwise clears any saved progress and returns None.
+        """
+        conn = self._connection()
+        if resume and self._meta("status") == "running" and self._meta("base_url") == base_url:
+            frontier = conn.execute("SELECT url, depth FROM frontier ORDER BY position").fetchall()
+            visited = conn.execute("SELECT url, unchanged FROM visited ORDER BY position").fetchall()
+            return {"frontier": frontier, "visited": [(url, bool(unchanged)) for url, unchanged in visited]}
+
+        conn.execute("DELETE FROM frontier")
+        conn.execute("DELETE FROM visited")
+        conn.executemany(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+            [("status", "running"), ("base_url", base_url), ("started_at", str(time.time()))],
+        )
+        conn.commit()
+        return None
+
+    def get_value(self, key: str):
+        value = self._meta(key)
+        return json.loads(value) if value is not None else None
+
+    def set_value(self, key: str, value):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value))
+        )
+        self._connection().commit()
+
+    def checkpoint(self, frontier: Iterable[Tuple[str, int]], visited: List[Tuple[str, bool]]):
+        """
+        Save the frontier (replacing the previous one) and the pages
+        visited so far.
+        """
+        conn = self._connection()
+        saved = conn.execute("SELECT COUNT(*) FROM visited").fetchone()[0]
+        conn.execute("DELETE FROM frontier")
+        conn.executemany("INSERT INTO frontier (url, depth) VALUES (?, ?)", list(frontier))
+        conn.executemany(
+            "INSERT INTO visited (url, unchanged) VALUES (?, ?)",
+            [(url, int(unchanged)) for url, unchanged in visited[saved:]],
+        )
+        conn.commit()
+
+    def finish(self):
+        conn = self._connection()
+        conn.execute("DELETE FROM frontier")
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('status', 'finished')")
+        conn.commit()
+
+    def page(self, url: str) -> Optional[Dict]:
+        row = self._connection().execute(
+            "SELECT etag, last_modified, content_hash, links, indexed, fetched_at FROM pages WHERE url = ?",
+            (canonicalize_url(url),),
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "content_hash": row[2],
+            "links": json.loads(row[3]) if row[3] else [],
+            "indexed": bool(row[4]),
+            "fetched_at": row[5],
+        }
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        If-None-Match / If-Modified-Since for a page whose last fetched
+        version was indexed; empty otherwise, so it is fetched in full.
+        """
+        page = self.page(url)
+        if not page or not page["indexed"]:
+            return {}
+        headers = {}
+        if page["etag"]:
+            headers["If-None-Match"] = page["etag"]
+        if page["last_modified"]:
+            headers["If-Modified-Since"] = page["last_modified"]
+        return headers
+
+    def record_fetch(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        body_hash: Optional[str],
+        links: Optional[List[str]],
+    ) -> bool:
+        """
+        Store the validators of a full (200) fetch. Returns True when the
+        page is unchanged since it was last indexed (same content hash).
+        """
+        previous = self.page(url)
+        unchanged = bool(
+            previous and previous["indexed"] and body_hash and previous["content_hash"] == body_hash
+        )
+        self._connection().execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                canonicalize_url(url),
+                etag,
+                last_modified,
+                body_hash,
+                json.dumps(links) if links is not None else None,
+                int(unchanged),
+                time.time(),
+            ),
+        )
+        self._connection().commit()
+        return unchanged
+
+    def record_not_modified(self, url: str):
+        self._connection().execute(
+            "UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), canonicalize_url(url))
+        )
+        self._connection().commit()
+
+    def mark_indexed(self, urls: Iterable[str]):
+        """
+        Mark the last fetched version of these pages as indexed; only then
+        are they re-fetched conditionally.
+        """
+        conn = self._connection()
+        conn.executemany(
+            "UPDATE pages SET indexed = 1 WHERE url = ?", [(canonicalize_url(u),) for u in urls]
+        )
+        conn.commit()
+
+    def reset(self):
+        """
+        Forget all validators and progress (forces a full re-crawl).
+        """
+        conn = self._connection()
+        for table in ("pages", "frontier", "visited", "meta"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.commit()
@@ -1,6 +1,18 @@
-import requests
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse, urldefrag
+from urllib.robotparser import RobotFileParser
+import httpx
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from dotenv import load_dotenv
+from app.utils.urls import canonicalize_url
+from app.scraping.crawl_state import CrawlState, content_hash
+from app.scraping.sitemaps import find_feeds, parse_feed, parse_sitemap
+
+load_dotenv()
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -8,6 +20,28 @@ HEADERS = {
     "Chrome/122.0 Safari/537.36"
 }
 
+# Requests in flight overall and per host
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "16"))
+CRAWL_PER_HOST_CONCURRENCY = int(os.getenv("CRAWL_PER_HOST_CONCURRENCY", "4"))
+# Minimum seconds between requests to one host; robots.txt Crawl-delay wins if larger
+CRAWL_DELAY = float(os.getenv("CRAWL_DELAY", "0"))
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "6"))
+CRAWL_TIMEOUT = float(os.getenv("CRAWL_TIMEOUT", "15"))
+CRAWL_RESPECT_ROBOTS = os.getenv("CRAWL_RESPECT_ROBOTS", "true").lower() == "true"
+# Seed the frontier from robots.txt sitemaps (or /sitemap.xml) and RSS/Atom feeds
+CRAWL_USE_SITEMAPS = os.getenv("CRAWL_USE_SITEMAPS", "true").lower() == "true"
+# Extra feeds to seed from, comma separated (feeds linked from the homepage are found automatically)
+CRAWL_FEED_URLS = [u.strip() for u in os.getenv("CRAWL_FEED_URLS", "").split(",") if u.strip()]
+CRAWL_MAX_SITEMAPS = int(os.getenv("CRAWL_MAX_SITEMAPS", "50"))
+# Skip pages whose sitemap lastmod is older than their last indexed fetch
+CRAWL_TRUST_LASTMOD = os.getenv("CRAWL_TRUST_LASTMOD", "true").lower() == "true"
+# Save crawl progress to the crawl state every this many pages
+CRAWL_CHECKPOINT_PAGES = int(os.getenv("CRAWL_CHECKPOINT_PAGES", "25"))
+
+
+# httpx.InvalidURL (e.g. a malformed link) is not an httpx.HTTPError
+FETCH_ERRORS = (httpx.HTTPError, httpx.InvalidURL)
+
 
 def is_valid_url(url: str, base_domain: str) -> bool:
     """
@@ -17,36 +51,453 @@ def is_valid_url(url: str, base_domain: str) -> bool:
     return parsed.scheme in ("http", "https") and base_domain in parsed.netloc
 
 
-def crawl_website(base_url: str, max_pages: int = 200):
+class HostPolicy:
     """
-    Crawl the MOSDAC website and return a list of unique URLs
+    Politeness state of one host: its robots.txt rules, a semaphore bounding
+    concurrent requests and the earliest time the next request may start.
     """
-    visited = set()
-    to_visit = [base_url]
 
-    base_domain = urlparse(base_url).netloc
+    def __init__(self, robots: Optional[RobotFileParser], delay: float, concurrency: int):
+        self.robots = robots
+        self.delay = delay
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    def allows(self, url: str) -> bool:
+        return self.robots is None or self.robots.can_fetch(HEADERS["User-Agent"], url)
+
+    async def wait_turn(self):
+        # Reserve the next start slot, then sleep until it comes up
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+async def fetch_robots(client: httpx.AsyncClient, base_url: str) -> Optional[RobotFileParser]:
+    """
+    Parsed robots.txt of the host of `base_url`; None (no restrictions)
+    when the host has none or it cannot be fetched.
+    """
+    parsed = urlparse(base_url)
+    robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+    try:
+        response = await client.get(robots_url)
+    except FETCH_ERRORS as e:
+        print(f"⚠️ Could not fetch {robots_url}: {e}")
+        return None
+    if response.status_code != 200:
+        return None
+
+    robots = RobotFileParser(robots_url)
+    robots.parse(response.text.splitlines())
+    return robots
+
+
+def _robots_delay(robots: Optional[RobotFileParser]) -> float:
+    if robots is None:
+        return 0.0
+    delay = robots.crawl_delay(HEADERS["User-Agent"]) or 0.0
+    rate = robots.request_rate(HEADERS["User-Agent"])
+    if rate and rate.requests:
+        delay = max(delay, rate.seconds / rate.requests)
+    return float(delay)
 
-    while to_visit and len(visited) < max_pages:
-        url = to_visit.pop(0)
-        if url in visited:
-            continue
 
+def url_section(url: str) -> str:
+    """
+    Top-level section of a URL path ("/catalog" for /catalog/satellite).
+    """
+    segments = [s for s in urlparse(url).path.split("/") if s]
+    return f"/{segments[0]}" if segments else "/"
+
+
+def extract_links(html: str, page_url: str, base_domain: str) -> List[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    links = []
+    for link in soup.find_all("a", href=True):
         try:
-            response = requests.get(url, headers=HEADERS, timeout=(5, 15))
-            response.raise_for_status()
-        except Exception as e:
-            print(f"❌ Failed to fetch {url}: {e}")
+            url, _ = urldefrag(urljoin(page_url, link["href"]))
+            valid = is_valid_url(url, base_domain)
+        except ValueError:  # malformed href, e.g. "http://[bad"
             continue
+        if valid:
+            links.append(url)
+    return links
+
+
+class Crawler:
+    """
+    Breadth-first asynchronous crawler. The frontier is a deque of
+    (url, depth); a seen-set of canonical URLs ensures every page is
+    enqueued once. One pooled HTTP/2 client is shared by all requests.
+
+    With a `state`, progress is checkpointed so an interrupted crawl
+    resumes, and pages indexed before are fetched conditionally: a 304 (or
+    an identical body) puts the URL in `unchanged` and its stored links are
+    followed without re-parsing.
+
+    With `use_sitemaps`, the frontier is first seeded from the site's
+    sitemaps and feeds, newest `lastmod` first. Links are then only
+    followed into sections (top-level paths) the sitemaps do not cover.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_pages: int = 200,
+        max_depth: int = CRAWL_MAX_DEPTH,
+        concurrency: int = CRAWL_CONCURRENCY,
+        per_host_concurrency: int = CRAWL_PER_HOST_CONCURRENCY,
+        delay: float = CRAWL_DELAY,
+        respect_robots: bool = CRAWL_RESPECT_ROBOTS,
+        state: Optional[CrawlState] = None,
+        resume: bool = True,
+        use_sitemaps: bool = CRAWL_USE_SITEMAPS,
+        feed_urls: Optional[List[str]] = None,
+    ):
+        self.base_url = base_url
+        self.base_domain = urlparse(base_url).netloc
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.delay = delay
+        self.respect_robots = respect_robots
+        self.state = state
+        self.resume = resume
+        self.use_sitemaps = use_sitemaps
+        self.feed_urls = CRAWL_FEED_URLS if feed_urls is None else feed_urls
+
+        self.frontier = deque()
+        self.seen = set()
+        self.visited: List[str] = []
+        self.unchanged: Set[str] = set()
+        self.in_flight: Dict[asyncio.Task, Tuple[str, int]] = {}
+        self.hosts: Dict[str, HostPolicy] = {}
+        self.lastmod: Dict[str, float] = {}
+        self.covered_sections: Set[str] = set()
+        self.stats = {
+            "fetched": 0,
+            "not_modified": 0,
+            "failed": 0,
+            "robots_blocked": 0,
+            "seeded": 0,
+            "lastmod_skipped": 0,
+            "covered_links_skipped": 0,
+        }
+
+    def enqueue(self, url: str, depth: int) -> bool:
+        key = canonicalize_url(url)
+        if key in self.seen or depth > self.max_depth:
+            return False
+        self.seen.add(key)
+        self.frontier.append((url, depth))
+        return True
+
+    async def host_policy(self, client: httpx.AsyncClient, url: str) -> HostPolicy:
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            robots = await fetch_robots(client, url) if self.respect_robots else None
+            # Another task may have resolved the host while robots.txt loaded
+            if host not in self.hosts:
+                self.hosts[host] = HostPolicy(
+                    robots, max(self.delay, _robots_delay(robots)), self.per_host_concurrency
+                )
+        return self.hosts[host]
 
-        visited.add(url)
-        soup = BeautifulSoup(response.text, "html.parser")
+    async def get(self, client: httpx.AsyncClient, url: str) -> Optional[httpx.Response]:
+        """
+        Politely fetch a sitemap, feed or seed page; None on failure.
+        """
+        policy = await self.host_policy(client, url)
+        if not policy.allows(url):
+            return None
+        async with policy.semaphore:
+            await policy.wait_turn()
+            try:
+                response = await client.get(url)
+                response.raise_for_status()
+                return response
+            except FETCH_ERRORS as e:
+                print(f"⚠️ Could not fetch {url}: {e}")
+                return None
 
-        for link in soup.find_all("a", href=True):
-            new_url = urljoin(url, link["href"])
-            if is_valid_url(new_url, base_domain) and new_url not in visited:
-                to_visit.append(new_url)
+    async def sitemap_entries(self, client: httpx.AsyncClient) -> List[Tuple[str, Optional[float]]]:
+        parsed = urlparse(self.base_url)
+        robots = (await self.host_policy(client, self.base_url)).robots
+        queue = deque((robots.site_maps() if robots else None) or [f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"])
+        entries, fetched = [], set()
+        while queue and len(fetched) < CRAWL_MAX_SITEMAPS:
+            sitemap_url = queue.popleft()
+            if sitemap_url in fetched:
+                continue
+            fetched.add(sitemap_url)
+            response = await self.get(client, sitemap_url)
+            if response is None:
+                continue
+            try:
+                pages, children = parse_sitemap(response.content)
+            except Exception as e:
+                print(f"⚠️ Could not parse sitemap {sitemap_url}: {e}")
+                continue
+            entries.extend(pages)
+            queue.extend(children)
+        return entries
 
-    return list(visited)
+    async def feed_entries(self, client: httpx.AsyncClient) -> List[Tuple[str, Optional[float]]]:
+        feeds = [urljoin(self.base_url, u) for u in self.feed_urls]
+        homepage = await self.get(client, self.base_url)
+        if homepage is not None and "text/html" in homepage.headers.get("Content-Type", ""):
+            feeds.extend(find_feeds(homepage.text, str(homepage.url)))
+
+        entries = []
+        for feed_url in dict.fromkeys(feeds):
+            response = await self.get(client, feed_url)
+            if response is None:
+                continue
+            try:
+                entries.extend(parse_feed(response.content, feed_url))
+            except Exception as e:
+                print(f"⚠️ Could not parse feed {feed_url}: {e}")
+        return entries
+
+    async def seed(self, client: httpx.AsyncClient):
+        """
+        Enqueue sitemap and feed entries, most recently modified first, and
+        record which sections the sitemaps cover. Feeds only list recent
+        items, so they never mark a section as covered.
+        """
+        entries = [(entry, True) for entry in await self.sitemap_entries(client)]
+        entries += [(entry, False) for entry in await self.feed_entries(client)]
+        latest: Dict[str, Tuple[str, Optional[float]]] = {}
+        in_sitemap = set()
+        for (url, lastmod), from_sitemap in entries:
+            try:
+                url, _ = urldefrag(url)
+                if not is_valid_url(url, self.base_domain):
+                    continue
+            except ValueError:
+                continue
+            key = canonicalize_url(url)
+            if from_sitemap:
+                in_sitemap.add(key)
+            previous = latest.get(key)
+            if previous is None or (lastmod or 0) > (previous[1] or 0):
+                latest[key] = (url, lastmod)
+
+        for key, (url, lastmod) in sorted(latest.items(), key=lambda item: -(item[1][1] or 0)):
+            if lastmod:
+                self.lastmod[key] = lastmod
+            if key in in_sitemap:
+                self.covered_sections.add(url_section(url))
+            if self.enqueue(url, 0):
+                self.stats["seeded"] += 1
+        # The homepage itself says nothing about which sections are covered
+        self.covered_sections.discard("/")
+        if self.state:
+            self.state.set_value("covered_sections", sorted(self.covered_sections))
+        print(
+            f"🗺️ Seeded {self.stats['seeded']} URLs from sitemaps and feeds "
+            f"covering {len(self.covered_sections)} sections"
+        )
+
+    def follow(self, links: Optional[List[str]], depth: int):
+        if not links or depth >= self.max_depth:
+            return
+        for link in links:
+            if self.covered_sections and url_section(link) in self.covered_sections:
+                if canonicalize_url(link) not in self.seen:
+                    self.stats["covered_links_skipped"] += 1
+                continue
+            self.enqueue(link, depth + 1)
+
+    def skip_by_lastmod(self, url: str, depth: int) -> bool:
+        """
+        True (and the page counted as unchanged) when its sitemap lastmod
+        predates the last fetch of its indexed version.
+        """
+        lastmod = self.lastmod.get(canonicalize_url(url))
+        if not (self.state and CRAWL_TRUST_LASTMOD and lastmod):
+            return False
+        page = self.state.page(url)
+        if not page or not page["indexed"] or page["fetched_at"] < lastmod:
+            return False
+        self.stats["lastmod_skipped"] += 1
+        self.visited.append(url)
+        self.unchanged.add(url)
+        self.follow(page["links"], depth)
+        return True
+
+    async def fetch(self, client: httpx.AsyncClient, url: str, depth: int):
+        if self.skip_by_lastmod(url, depth):
+            return
+        policy = await self.host_policy(client, url)
+        if not policy.allows(url):
+            self.stats["robots_blocked"] += 1
+            return
+
+        headers = self.state.conditional_headers(url) if self.state else {}
+        async with policy.semaphore:
+            await policy.wait_turn()
+            try:
+                async with client.stream("GET", url, headers=headers) as response:
+                    not_modified = response.status_code == 304
+                    if not not_modified:
+                        response.raise_for_status()
+                    content_type = response.headers.get("Content-Type", "").lower()
+                    # Only HTML is parsed for links; skip downloading PDFs and other files
+                    html = body_hash = None
+                    if "text/html" in content_type and not not_modified:
+                        body_hash = content_hash(await response.aread())
+                        html = response.text
+                    final_url = str(response.url)
+            except FETCH_ERRORS as e:
+                self.stats["failed"] += 1
+                print(f"❌ Failed to fetch {url}: {e}")
+                return
+
+        self.stats["not_modified" if not_modified else "fetched"] += 1
+        self.visited.append(url)
+        # Redirect targets are the same page; don't crawl them again
+        self.seen.add(canonicalize_url(final_url))
+
+        if not_modified:
+            self.unchanged.add(url)
+            self.state.record_not_modified(url)
+            links = self.state.page(url)["links"]
+        else:
+            links = extract_links(html, final_url, self.base_domain) if html is not None else None
+            if self.state and self.state.record_fetch(
+                url,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                body_hash,
+                links,
+            ):
+                self.unchanged.add(url)
+
+        self.follow(links, depth)
+
+    def checkpoint(self):
+        self.state.checkpoint(
+            list(self.in_flight.values()) + list(self.frontier),
+            [(url, url in self.unchanged) for url in self.visited],
+        )
+
+    def restore(self) -> bool:
+        """
+        Start (or resume) the crawl in the crawl state. True if an
+        interrupted crawl was restored.
+        """
+        saved = self.state.start(self.base_url, self.resume)
+        if not saved:
+            return False
+        for url, unchanged in saved["visited"]:
+            self.visited.append(url)
+            self.seen.add(canonicalize_url(url))
+            if unchanged:
+                self.unchanged.add(url)
+        for url, depth in saved["frontier"]:
+            self.enqueue(url, depth)
+        self.covered_sections = set(self.state.get_value("covered_sections") or [])
+        print(
+            f"↩️ Resuming crawl: {len(self.visited)} pages already visited, "
+            f"{len(self.frontier)} in frontier"
+        )
+        return True
+
+    async def run(self) -> List[str]:
+        resumed = bool(self.state and self.restore())
+        if not resumed:
+            self.enqueue(self.base_url, 0)
+        limits = httpx.Limits(
+            max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+        )
+        async with httpx.AsyncClient(
+            http2=True,
+            headers=HEADERS,
+            timeout=httpx.Timeout(CRAWL_TIMEOUT, connect=5.0),
+            limits=limits,
+            follow_redirects=True,
+        ) as client:
+            if self.use_sitemaps and not resumed:
+                await self.seed(client)
+            pending = set()
+            checkpointed = len(self.visited)
+            while self.frontier or pending:
+                while (
+                    self.frontier
+                    and len(pending) < self.concurrency
+                    and len(self.visited) + len(pending) < self.max_pages
+                ):
+                    url, depth = self.frontier.popleft()
+                    task = asyncio.create_task(self.fetch(client, url, depth))
+                    self.in_flight[task] = (url, depth)
+                    pending.add(task)
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    url, _ = self.in_flight.pop(task)
+                    if task.exception() is not None:
+                        self.stats["failed"] += 1
+                        print(f"❌ Failed to crawl {url}: {task.exception()!r}")
+                        # A page that failed part-way is not a crawl result
+                        if url in self.visited:
+                            self.visited.remove(url)
+                        self.unchanged.discard(url)
+                if self.state and len(self.visited) - checkpointed >= CRAWL_CHECKPOINT_PAGES:
+                    self.checkpoint()
+                    checkpointed = len(self.visited)
+
+        if self.state:
+            self.checkpoint()
+            self.state.finish()
+
+        del self.visited[self.max_pages :]
+        return self.visited
+
+
+async def _crawl(base_url: str, max_pages: int, **options) -> Crawler:
+    crawler = Crawler(base_url, max_pages=max_pages, **options)
+    started = time.time()
+    await crawler.run()
+    print(
+        f"🕸️ Crawled {crawler.stats['fetched']} pages in {time.time() - started:.1f}s "
+        f"({crawler.stats['seeded']} seeded from sitemaps/feeds, "
+        f"{crawler.stats['not_modified'] + crawler.stats['lastmod_skipped']} not modified, "
+        f"{crawler.stats['failed']} failed, "
+        f"{crawler.stats['robots_blocked']} blocked by robots.txt, "
+        f"{crawler.stats['covered_links_skipped']} links into sitemap-covered sections skipped, "
+        f"{len(crawler.frontier)} left in frontier)"
+    )
+    return crawler
+
+
+async def crawl_website_async(base_url: str, max_pages: int = 200, **options) -> List[str]:
+    return (await _crawl(base_url, max_pages, **options)).visited
+
+
+def crawl_website(base_url: str, max_pages: int = 200, **options) -> List[str]:
+    """
+    Crawl the MOSDAC website and return a list of unique URLs
+    """
+    return asyncio.run(crawl_website_async(base_url, max_pages, **options))
+
+
+def crawl_changes(
+    base_url: str, state: CrawlState, max_pages: int = 200, resume: bool = True, **options
+) -> Tuple[List[str], Set[str]]:
+    """
+    Incremental crawl: returns (all visited URLs, the subset that is
+    unchanged since it was last indexed).
+    """
+    crawler = asyncio.run(_crawl(base_url, max_pages, state=state, resume=resume, **options))
+    return crawler.visited, crawler.unchanged
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+# Canonical mission names and the extra spellings and short forms they
+# appear under. Short forms are only listed where they are unambiguous
+# ("oceansat" alone could be either OCEANSAT-2 or -3).
+MISSIONS = {
+    "INSAT-3D": [],
+    "INSAT-3DR": ["3dr"],
+    "INSAT-3DS": ["3ds"],
+    "KALPANA-1": ["kalpana"],
+    "OCEANSAT-2": ["os-2"],
+    "OCEANSAT-3": ["eos-06", "os-3"],
+    "SCATSAT-1": ["scatsat"],
+    "MEGHA-TROPIQUES": ["megha"],
+    "SARAL-ALTIKA": ["saral"],
+    "RISAT-1": [],
+    "EOS-04": ["risat-1a"],
+}
+
+SENSORS = {
+    "IMAGER": [],
+    "SOUNDER": [],
+    "VHRR": [],
+    "OCM": ["ocean colour monitor", "ocean color monitor"],
+    "OSCAT": ["scatterometer"],
+    "MADRAS": [],
+    "SAPHIR": [],
+    "SCARAB": [],
+    "ALTIKA": [],
+    "SSTM": [],
+    "GNSS-RO": ["rosa"],
+}
+
+# (doc_type, pattern over the lowercased url path and title)
+DOC_TYPE_RULES = [
+    ("document", re.compile(r"\.(pdf|docx?|pptx?)$|/(documents?|manuals?|atbd)\b")),
+    ("faq", re.compile(r"\bfaqs?\b")),
+    ("news", re.compile(r"\b(news|announcements?|events?|press)\b")),
+    ("product", re.compile(r"\b(catalog|products?|datasets?|data-access)\b")),
+    ("tool", re.compile(r"\b(tools?|visuali[sz]ation|portal|apps?)\b")),
+    ("mission", re.compile(r"\b(missions?|satellites?|insat|oceansat|scatsat|kalpana|saral|megha)\b")),
+]
+
+FILTER_FIELDS = ("mission", "sensor", "product_level", "doc_type", "domain_path")
+
+_LEVEL_PATTERN = re.compile(r"(?<![a-z0-9])(?:level[\s\-_]*|l)([0-4])([a-c])?(?![a-z0-9])")
+
+
+def _name_pattern(name: str) -> str:
+    # "INSAT-3DR" -> insat, 3, dr joined by optional separators
+    parts = re.findall(r"[a-z]+|[0-9]+", name.lower())
+    return r"(?<![a-z0-9])" + r"[\s\-_]*".join(parts) + r"(?![a-z0-9])"
+
+
+def _compile(names: Dict[str, List[str]]):
+    return [
+        (canonical, re.compile("|".join(_name_pattern(n) for n in [canonical] + aliases)))
+        for canonical, aliases in names.items()
+    ]
+
+
+_MISSION_PATTERNS = _compile(MISSIONS)
+_SENSOR_PATTERNS = _compile(SENSORS)
+
+
+def find_missions(text: str) -> List[str]:
+    text = text.lower()
+    return [name for name, pattern in _MISSION_PATTERNS if pattern.search(text)]
+
+
+def extract_metadata(url: str, title: str, content: str) -> Dict:
+    """
+    Structured metadata of a scraped page, stored in every chunk payload
+    and indexed in Qdrant for filtered retrieval.
+    """
+    text = f"{title} {content}".lower()
+    path = urlparse(url).path.lower().rstrip("/")
+    segments = [s for s in path.split("/") if s]
+
+    doc_type = "page"
+    for name, pattern in DOC_TYPE_RULES:
+        if pattern.search(f"{path} {title.lower()}"):
+            doc_type = name
+            break
+
+    return {
+        "mission": find_missions(f"{url} {text}"),
+        "sensor": [name for name, pattern in _SENSOR_PATTERNS if pattern.search(text)],
+        "product_level": sorted(
+            {f"L{level}{sub.upper()}" for level, sub in _LEVEL_PATTERN.findall(text)}
+        ),
+        "doc_type": doc_type,
+        # Every path prefix, so a filter on "/catalog" matches all pages below it
+        "domain_path": ["/" + "/".join(segments[: i + 1]) for i in range(min(len(segments), 3))]
+        or ["/"],
+    }
+
+
+def detect_filters(query: str) -> Optional[Dict[str, List[str]]]:
+    """
+    Filters implied by the query text: currently the missions it names.
+    """
+    missions = find_missions(query)
+    return {"mission": missions} if missions else None
+
+
+def matches_filters(payload: Dict, filters: Optional[Dict]) -> bool:
+    """
+    True when the payload satisfies every filter field (any of its values).
+    """
+    for field, wanted in (filters or {}).items():
+        wanted = wanted if isinstance(wanted, list) else [wanted]
+        value = payload.get(field)
+        values = value if isinstance(value, list) else [value]
+        if not set(values) & set(wanted):
+            return False
+    return True
@@ -1,5 +1,6 @@
 import re
 from typing import Dict, List
+from app.scraping.metadata import extract_metadata
 
 
 def clean_text(text: str) -> str:
@@ -12,9 +13,11 @@ def clean_text(text: str) -> str:
 def chunk_text(data: Dict, chunk_size: int = 500) -> List[Dict]:
     """
     Split page content into small chunks.
-    Returns list of dicts {url, title, chunk_id, content}
+    Returns list of dicts {url, title, chunk_id, content} plus the page
+    metadata (mission, sensor, product_level, doc_type, domain_path)
     """
     cleaned = clean_text(data["content"])
+    metadata = extract_metadata(data["url"], data["title"], cleaned)
     words = cleaned.split()
     chunks = []
 
@@ -27,6 +30,7 @@ def chunk_text(data: Dict, chunk_size: int = 500) -> List[Dict]:
                 "title": data["title"],
                 "chunk_id": i // chunk_size,
                 "content": chunk_text,
+                **metadata,
             }
         )
     return chunks
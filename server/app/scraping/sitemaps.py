@@ -0,0 +1,82 @@
+import re
+import gzip
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+
+_FEED_TYPE = re.compile(r"application/(rss|atom)\+xml")
+
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    """
+    Timestamp of a sitemap <lastmod> (W3C datetime) or feed date (RFC 822
+    or ISO 8601). Dates without a timezone are taken as UTC.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _xml(body: bytes) -> BeautifulSoup:
+    if body[:2] == b"\x1f\x8b":  # sitemap.xml.gz
+        body = gzip.decompress(body)
+    return BeautifulSoup(body, "xml")
+
+
+def _text(tag) -> Optional[str]:
+    return tag.get_text(strip=True) if tag else None
+
+
+def parse_sitemap(body: bytes) -> Tuple[List[Tuple[str, Optional[float]]], List[str]]:
+    """
+    Parse a sitemap or sitemap index. Returns ([(page url, lastmod)],
+    [child sitemap urls]).
+    """
+    soup = _xml(body)
+    children = [_text(s.find("loc")) for s in soup.find_all("sitemap")]
+    pages = [(_text(u.find("loc")), parse_date(_text(u.find("lastmod")))) for u in soup.find_all("url")]
+    return [(url, lastmod) for url, lastmod in pages if url], [url for url in children if url]
+
+
+def parse_feed(body: bytes, feed_url: str) -> List[Tuple[str, Optional[float]]]:
+    """
+    Entry links and dates of an RSS 2.0 or Atom feed.
+    """
+    soup = _xml(body)
+    entries = []
+    for item in soup.find_all("item"):
+        link = _text(item.find("link")) or _text(item.find("guid"))
+        date = _text(item.find("pubDate")) or _text(item.find("date"))
+        if link:
+            entries.append((urljoin(feed_url, link), parse_date(date)))
+    for entry in soup.find_all("entry"):
+        links = entry.find_all("link", href=True)
+        link = next((l for l in links if l.get("rel", "alternate") == "alternate"), None)
+        date = _text(entry.find("updated")) or _text(entry.find("published"))
+        if link:
+            entries.append((urljoin(feed_url, link["href"]), parse_date(date)))
+    return entries
+
+
+def find_feeds(html: str, page_url: str) -> List[str]:
+    """
+    Feeds advertised by a page with <link rel="alternate" type="application/rss+xml">.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    return [
+        urljoin(page_url, link["href"])
+        for link in soup.find_all("link", href=True, type=_FEED_TYPE)
+        if "alternate" in (link.get("rel") or [])
+    ]
@@ -1,23 +1,70 @@
 import os
-from typing import List, Dict
+import json
+import time
+import hashlib
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict, AsyncIterator, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from sqlalchemy.orm import Session
-from app.vector_db.qdrant_client import search_chunks
+from starlette.concurrency import run_in_threadpool
+from app.vector_db.qdrant_client import (
+    search_chunks,
+    search_chunks_async,
+    search_chunks_batch_async,
+)
+from app.vector_db.fusion import reciprocal_rank_fusion
+from app.services.embeddings import embed_texts, embed_texts_async, embedding_provider
+from app.services.semantic_cache import semantic_cache, is_self_contained, SEMANTIC_CACHE_ENABLED
+from app.services.hyde_cache import hyde_cache, normalize_query, HYDE_CACHE_ENABLED
+from app.services.singleflight import SingleFlight
+from app.services.prompt_builder import SYSTEM_PROMPT, build_context_message
+from app.services.conversation_memory import get_summary, RECENT_MESSAGES
+from app.services.query_router import (
+    route_query,
+    router_stats,
+    QUERY_ROUTER_ENABLED,
+    ROUTE_SMALLTALK,
+    ROUTE_DIRECT,
+    ROUTE_HYDE,
+)
+from app.scraping.metadata import detect_filters
 from app.models.chat_context import ChatContext
 
 load_dotenv()
 
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+CHAT_MODEL = "gemini-2.5-flash"
+
 client = OpenAI(
     api_key=os.getenv("GEMINI_API_KEY"),
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+    base_url=GEMINI_BASE_URL,
+)
+async_client = AsyncOpenAI(
+    api_key=os.getenv("GEMINI_API_KEY"),
+    base_url=GEMINI_BASE_URL,
 )
 
+# Run the direct query search concurrently with HyDE and fuse both hit lists
+HYDE_PARALLEL = os.getenv("HYDE_PARALLEL", "false").lower() == "true"
+HYDE_DEADLINE_MS = int(os.getenv("HYDE_DEADLINE_MS", "2500"))
 
-def generate_hypothetical_answer(query: str) -> str:
+HISTORY_WINDOW = 6
+
+# Restrict retrieval to the missions a query names when no filters are given
+AUTO_QUERY_FILTERS = os.getenv("AUTO_QUERY_FILTERS", "true").lower() == "true"
+
+hyde_flight = SingleFlight("hyde")
+completion_flight = SingleFlight("completion")
+
+_hyde_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hyde")
+_background_tasks = set()
+
+
+def build_hyde_messages(query: str) -> List[Dict]:
     """
-    Generate a hypothetical answer using HyDE approach.
-    This creates an ideal answer that will be used for better vector search.
+    Build the chat messages used to generate a HyDE hypothetical answer.
     """
     hyde_prompt = f"""
     You are a technical expert from MOSDAC (Meteorological and Oceanographic Satellite Data Archival Centre). 
@@ -35,23 +82,99 @@ def generate_hypothetical_answer(query: str) -> str:
     Generate a detailed hypothetical answer:
     """
 
+    return [
+        {
+            "role": "system",
+            "content": "You are a MOSDAC domain expert creating hypothetical answers for retrieval enhancement.",
+        },
+        {"role": "user", "content": hyde_prompt},
+    ]
+
+
+def _request_hypothetical_answer(query: str) -> Optional[str]:
     try:
         response = client.chat.completions.create(
-            model="gemini-2.5-flash",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a MOSDAC domain expert creating hypothetical answers for retrieval enhancement.",
-                },
-                {"role": "user", "content": hyde_prompt},
-            ],
+            model=CHAT_MODEL,
+            messages=build_hyde_messages(query),
+            temperature=0.3,
+            max_tokens=800,
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"HyDE generation failed: {e}")
+        return None
+
+
+async def _request_hypothetical_answer_async(query: str) -> Optional[str]:
+    try:
+        response = await async_client.chat.completions.create(
+            model=CHAT_MODEL,
+            messages=build_hyde_messages(query),
             temperature=0.3,
             max_tokens=800,
         )
         return response.choices[0].message.content.strip()
     except Exception as e:
         print(f"HyDE generation failed: {e}")
-        return query
+        return None
+
+
+def generate_hypothetical_answer(query: str) -> str:
+    """
+    Generate a hypothetical answer using HyDE approach.
+    This creates an ideal answer that will be used for better vector search.
+    Concurrent calls for the same normalized query share one LLM request.
+    Falls back to the query itself when generation fails.
+    """
+    answer = hyde_flight.do(normalize_query(query), _request_hypothetical_answer, query)
+    return answer or query
+
+
+async def generate_hypothetical_answer_async(query: str) -> str:
+    """
+    Async variant of generate_hypothetical_answer.
+    """
+    answer = await hyde_flight.do_async(
+        normalize_query(query), _request_hypothetical_answer_async, query
+    )
+    return answer or query
+
+
+def _completion_key(messages: List[Dict]) -> str:
+    return hashlib.sha1(json.dumps(messages, sort_keys=True).encode()).hexdigest()
+
+
+def _create_completion(messages: List[Dict]) -> str:
+    response = client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=messages,
+        temperature=0.1,
+        max_tokens=1000,
+    )
+    return response.choices[0].message.content.strip()
+
+
+async def _create_completion_async(messages: List[Dict]) -> str:
+    response = await async_client.chat.completions.create(
+        model=CHAT_MODEL,
+        messages=messages,
+        temperature=0.1,
+        max_tokens=1000,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def complete(messages: List[Dict]) -> str:
+    """
+    Answer completion; identical concurrent prompts share one LLM request.
+    """
+    return completion_flight.do(_completion_key(messages), _create_completion, messages)
+
+
+async def complete_async(messages: List[Dict]) -> str:
+    return await completion_flight.do_async(
+        _completion_key(messages), _create_completion_async, messages
+    )
 
 
 def build_enhanced_prompt(
@@ -59,150 +182,622 @@ def build_enhanced_prompt(
     context_chunks: List[Dict],
     chat_history: List[ChatContext],
     hypothetical_answer: str = None,
-) -> str:
+    summary: str = None,
+) -> List[Dict]:
     """
-    Build an enhanced prompt with context, chat history, and HyDE information
+    Build the answer messages: the static MOSDAC instructions first (a stable
+    prefix for provider-side prompt caching), then the retrieved context, the
+    rolling conversation summary and recent history fitted to
+    PROMPT_TOKEN_BUDGET, then the user query.
     """
-    context_texts = ""
-    for i, chunk in enumerate(context_chunks, 1):
-        source_info = chunk.get("metadata", {}).get("source", "Unknown")
-        confidence = chunk.get("score", 0)
-        context_texts += (
-            f"[Context {i} - Source: {source_info}, Relevance: {confidence:.3f}]\n"
-        )
-        context_texts += f"{chunk['content']}\n\n"
+    history_lines = [
+        f"{'User' if chat.role == 'user' else 'Assistant'}: {chat.content}"
+        for chat in chat_history[-HISTORY_WINDOW:]
+    ]
+    context_message = build_context_message(
+        query, context_chunks, history_lines, hypothetical_answer, summary=summary
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "system", "content": context_message},
+        {"role": "user", "content": query},
+    ]
+
+
+NO_CONTEXT_ANSWER = "I could not find relevant information about this topic in the MOSDAC database. The query may be outside the current dataset coverage or use different terminology than our documentation."
+
+
+def load_history(db: Session, user_id: int, limit: int = HISTORY_WINDOW) -> List[ChatContext]:
+    """
+    Load the most recent `limit` chat messages of a user, oldest first.
+    """
+    recent = (
+        db.query(ChatContext)
+        .filter(ChatContext.user_id == user_id)
+        .order_by(ChatContext.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return recent[::-1]
 
-    history_texts = ""
-    if chat_history:
-        recent_history = chat_history[-6:]
-        history_texts = "Recent Conversation History:\n"
-        for chat in recent_history:
-            role = "User" if chat.role == "user" else "Assistant"
-            history_texts += f"{role}: {chat.content}\n"
 
-    system_prompt = f"""
-        # MOSDAC Expert Assistant
+def load_conversation(db: Session, user_id: int):
+    """
+    Return (summary, recent messages). Once a rolling summary exists only the
+    last RECENT_MESSAGES are replayed verbatim.
+    """
+    summary = get_summary(db, user_id)
+    limit = RECENT_MESSAGES if summary else HISTORY_WINDOW
+    return summary, load_history(db, user_id, limit)
+
+
+def save_exchange(db: Session, user_id: int, query: str, answer: str) -> None:
+    """
+    Persist a user query and the assistant answer to the chat history.
+    """
+    db.add(ChatContext(user_id=user_id, role="user", content=query))
+    db.add(ChatContext(user_id=user_id, role="assistant", content=answer))
+    db.commit()
+
+
+def _source_metadata(hits: List[Dict]) -> List[Dict]:
+    return [
+        {
+            "url": hit.get("url", ""),
+            "title": hit.get("title", ""),
+            "chunk_id": hit.get("chunk_id"),
+            "score": hit.get("score"),
+        }
+        for hit in hits
+    ]
 
-        ## ROLE & PURPOSE
-        You are an AI assistant specialized in MOSDAC (Meteorological and Oceanographic Satellite Data Archival Centre) datasets, satellite missions, and remote sensing data. Your primary role is to provide accurate, technical information about MOSDAC's data products and services.
 
-        ## CONVERSATION EXAMPLES
-        Here are some example interactions to guide your responses:
+def _hyde_search(query: str, top_k: int, filters: Optional[Dict] = None):
+    """
+    HyDE retrieval: search with the embedding of a hypothetical answer.
+    Answers and their embeddings are memoized in the on-disk HyDE cache.
+    Returns (hits, hypothetical_answer).
+    """
+    cached = hyde_cache.get(query, embedding_provider.model) if HYDE_CACHE_ENABLED else None
+    if cached:
+        hypothetical_answer, hyde_vector = cached
+    else:
+        print("Generating HyDE hypothetical answer...")
+        hypothetical_answer = generate_hypothetical_answer(query)
+        hyde_vector = embed_texts([hypothetical_answer])[0]
+        if HYDE_CACHE_ENABLED and hypothetical_answer != query:
+            hyde_cache.put(query, embedding_provider.model, hypothetical_answer, hyde_vector)
+    hits = search_chunks(
+        hypothetical_answer,
+        top_k=top_k,
+        query_vector=hyde_vector,
+        lexical_query=query,
+        filters=filters,
+    )
+    return hits, hypothetical_answer
+
+
+async def _hyde_search_async(query: str, top_k: int, filters: Optional[Dict] = None):
+    cached = None
+    if HYDE_CACHE_ENABLED:
+        cached = await run_in_threadpool(hyde_cache.get, query, embedding_provider.model)
+    if cached:
+        hypothetical_answer, hyde_vector = cached
+    else:
+        hypothetical_answer = await generate_hypothetical_answer_async(query)
+        hyde_vector = (await embed_texts_async([hypothetical_answer]))[0]
+        if HYDE_CACHE_ENABLED and hypothetical_answer != query:
+            await run_in_threadpool(
+                hyde_cache.put, query, embedding_provider.model, hypothetical_answer, hyde_vector
+            )
+    hits = await search_chunks_async(
+        hypothetical_answer,
+        top_k=top_k,
+        query_vector=hyde_vector,
+        lexical_query=query,
+        filters=filters,
+    )
+    return hits, hypothetical_answer
+
+
+def _retrieve(query: str, top_k: int, use_hyde: bool, query_vector=None, filters=None):
+    """
+    Run HyDE (optional) and vector search. Returns (hits, hypothetical_answer).
+    With HYDE_PARALLEL the direct query search runs alongside HyDE and both
+    hit lists are merged by rank fusion; if HyDE misses the HYDE_DEADLINE_MS
+    deadline the direct hits are used alone.
+    """
+    if not use_hyde:
+        return search_chunks(query, top_k=top_k, query_vector=query_vector, filters=filters), None
+
+    if not HYDE_PARALLEL:
+        return _hyde_search(query, top_k, filters)
 
-        **User:** "Hi" or "Hello"
-        **Assistant:** "Hello! I'm your MOSDAC AI assistant. How can I help you with satellite data, weather information, or ocean monitoring today?"
+    deadline = time.monotonic() + HYDE_DEADLINE_MS / 1000
+    hyde_future = _hyde_executor.submit(_hyde_search, query, top_k, filters)
+    direct_hits = search_chunks(query, top_k=top_k, query_vector=query_vector, filters=filters)
 
-        **User:** "What can you help me with?"
-        **Assistant:** "I can help you with various MOSDAC services including satellite datasets (OCM, SCATSAT-1, INSAT-3D), weather data, ocean state parameters, and data download assistance. What specific information are you looking for?"
+    try:
+        hyde_hits, hypothetical_answer = hyde_future.result(
+            timeout=max(0.0, deadline - time.monotonic())
+        )
+    except FutureTimeoutError:
+        # Let HyDE finish in the background so its result still warms the cache
+        print(f"HyDE missed the {HYDE_DEADLINE_MS}ms deadline, using direct hits")
+        return direct_hits, None
 
-        **User:** "Tell me about weather data"
-        **Assistant:** "MOSDAC provides comprehensive weather data from multiple satellite missions. I can help you understand available parameters, temporal coverage, spatial resolution, and data access methods. What specific weather parameter interests you?"
+    return reciprocal_rank_fusion([hyde_hits, direct_hits], top_k=top_k), hypothetical_answer
 
-        **User:** "How do I download data?"
-        **Assistant:** "MOSDAC offers various data download options through their portal. I can guide you through the download process, explain data formats, and help you select the right datasets for your needs. What type of data are you looking to download?"
 
-        ## CONTEXT & GROUNDING
-        You have access to the following information:
+async def _retrieve_async(query: str, top_k: int, use_hyde: bool, query_vector=None, filters=None):
+    if not use_hyde:
+        hits = await search_chunks_async(query, top_k=top_k, query_vector=query_vector, filters=filters)
+        return hits, None
 
-        ### RETRIEVED CONTEXT FROM MOSDAC DATABASE:
-        {context_texts}
+    if not HYDE_PARALLEL:
+        return await _hyde_search_async(query, top_k, filters)
 
-        ### CONVERSATION CONTEXT:
-        {history_texts if history_texts else "No recent conversation history."}
+    deadline = time.monotonic() + HYDE_DEADLINE_MS / 1000
+    hyde_task = asyncio.create_task(_hyde_search_async(query, top_k, filters))
+    _background_tasks.add(hyde_task)
+    hyde_task.add_done_callback(_background_tasks.discard)
+    direct_hits = await search_chunks_async(query, top_k=top_k, query_vector=query_vector, filters=filters)
 
-        {'### HYPOTHETICAL ANSWER ANALYSIS:' if hypothetical_answer else ''}
-        {'A hypothetical answer was generated to guide retrieval. Use this for understanding the query intent but verify all facts against the actual context above.' if hypothetical_answer else ''}
+    try:
+        hyde_hits, hypothetical_answer = await asyncio.wait_for(
+            asyncio.shield(hyde_task), timeout=max(0.0, deadline - time.monotonic())
+        )
+    except asyncio.TimeoutError:
+        print(f"HyDE missed the {HYDE_DEADLINE_MS}ms deadline, using direct hits")
+        return direct_hits, None
 
-        ## RESPONSE GUIDELINES
+    return reciprocal_rank_fusion([hyde_hits, direct_hits], top_k=top_k), hypothetical_answer
 
-        ### CONVERSATIONAL APPROACH:
-        - For greetings, respond warmly and offer specific help
-        - For general questions, provide overview and ask for specifics
-        - Maintain a helpful, professional tone throughout
 
-        ### DATA SPECIFICITY:
-        - Reference specific satellite missions (OCM, SCATSAT-1, INSAT-3D, etc.)
-        - Mention precise parameters (SST, Chlorophyll, Wind Vectors, Aerosols, etc.)
-        - Include temporal and spatial coverage details when available
-        - Reference specific data products and their applications
+def _route(query: str, use_hyde: bool) -> Dict:
+    if QUERY_ROUTER_ENABLED:
+        return route_query(query, allow_hyde=use_hyde)
+    return {"route": ROUTE_HYDE if use_hyde else ROUTE_DIRECT, "reason": "router_disabled", "answer": None}
 
-        ### RESPONSE STRUCTURE:
-        1. Start with a direct answer to the core question
-        2. Provide supporting details from the context
-        3. Mention data sources and their relevance
-        4. Suggest related datasets or parameters when appropriate
 
-        ### QUALITY ASSURANCE:
-        - Base answers STRICTLY on the provided context
-        - If information is incomplete, acknowledge limitations
-        - For technical queries, maintain scientific accuracy
-        - Cross-reference multiple context chunks when available
+def _resolve_filters(query: str, filters: Optional[Dict]) -> Optional[Dict]:
+    if filters is None and AUTO_QUERY_FILTERS:
+        return detect_filters(query)
+    return filters
 
-        ### HANDLING UNCERTAINTY:
-        If the context doesn't contain sufficient information, respond with:
-        "I could not find specific information about this in the current MOSDAC data. The available context covers [mention what IS available], but doesn't address your specific question about [mention the gap]."
 
-        ## CURRENT QUERY ANALYSIS:
-        User wants to know: {query}
+def _cacheable(query: str, filters: Optional[Dict]) -> bool:
+    """
+    The semantic cache is shared by all users, so only self-contained
+    queries without explicit filters use it; their answers are built
+    without the user's conversation (see _conversation_for).
+    """
+    return SEMANTIC_CACHE_ENABLED and filters is None and is_self_contained(query)
 
-        Now provide a comprehensive, technically accurate response:
-        """
 
-    return system_prompt.strip()
+def _conversation_for(db: Session, user_id: int, use_cache: bool):
+    """
+    (summary, history) for the prompt; empty for cache-eligible queries so
+    a cached answer never carries one user's conversation to another.
+    """
+    return (None, []) if use_cache else load_conversation(db, user_id)
 
 
 def chatbot_response(
-    query: str, user_id: int, db: Session, top_k: int = 5, use_hyde: bool = True
+    query: str,
+    user_id: int,
+    db: Session,
+    top_k: int = 5,
+    use_hyde: bool = True,
+    filters: Optional[Dict] = None,
 ) -> str:
     """
     Enhanced chatbot response using HyDE + Qdrant + LLM.
-    Persists chat history in Postgres per user.
+    The query router answers small talk directly and decides whether HyDE
+    is worth its extra LLM call. Persists chat history in Postgres per user.
+    `filters` restricts retrieval by chunk metadata (mission, sensor,
+    product_level, doc_type, domain_path); without it, missions named in
+    the query are used.
     """
-    history = (
-        db.query(ChatContext)
-        .filter(ChatContext.user_id == user_id)
-        .order_by(ChatContext.id.asc())
-        .all()
+    started = time.monotonic()
+    decision = _route(query, use_hyde)
+    try:
+        if decision["route"] == ROUTE_SMALLTALK:
+            save_exchange(db, user_id, query, decision["answer"])
+            return decision["answer"]
+        return _rag_response(
+            query,
+            user_id,
+            db,
+            top_k,
+            use_hyde=decision["route"] == ROUTE_HYDE,
+            filters=filters,
+        )
+    finally:
+        router_stats.record(decision["route"], time.monotonic() - started)
+
+
+def _rag_response(
+    query: str,
+    user_id: int,
+    db: Session,
+    top_k: int,
+    use_hyde: bool,
+    filters: Optional[Dict] = None,
+) -> str:
+    use_cache = _cacheable(query, filters)
+    summary, history = _conversation_for(db, user_id, use_cache)
+    filters = _resolve_filters(query, filters)
+    query_vector = None
+    if use_cache:
+        query_vector = embed_texts([query])[0]
+        cached = semantic_cache.get(query_vector)
+        if cached:
+            save_exchange(db, user_id, query, cached["answer"])
+            return cached["answer"]
+
+    hits, hypothetical_answer = _retrieve(query, top_k, use_hyde, query_vector, filters)
+
+    if not hits:
+        answer = NO_CONTEXT_ANSWER
+        save_exchange(db, user_id, query, answer)
+        return answer
+
+    messages = build_enhanced_prompt(
+        query, hits, history, hypothetical_answer, summary=summary
     )
 
-    hypothetical_answer = None
-    search_query = query
+    try:
+        answer = complete(messages)
+    except Exception as e:
+        return f"I encountered a technical issue while processing your query: {str(e)}"
 
-    if use_hyde:
-        print("Generating HyDE hypothetical answer...")
-        hypothetical_answer = generate_hypothetical_answer(query)
-        search_query = hypothetical_answer
+    save_exchange(db, user_id, query, answer)
+    if use_cache:
+        semantic_cache.put(query_vector, query, answer, _source_metadata(hits))
+
+    return answer
+
+
+async def chatbot_response_async(
+    query: str,
+    user_id: int,
+    db: Session,
+    top_k: int = 5,
+    use_hyde: bool = True,
+    filters: Optional[Dict] = None,
+) -> str:
+    """
+    Async variant of chatbot_response. Network calls (HyDE, embedding, Qdrant,
+    LLM) are awaited on the event loop; the short blocking DB calls run in the
+    threadpool so no worker is held for the whole pipeline.
+    """
+    started = time.monotonic()
+    decision = _route(query, use_hyde)
+    try:
+        if decision["route"] == ROUTE_SMALLTALK:
+            await run_in_threadpool(save_exchange, db, user_id, query, decision["answer"])
+            return decision["answer"]
+        return await _rag_response_async(
+            query,
+            user_id,
+            db,
+            top_k,
+            use_hyde=decision["route"] == ROUTE_HYDE,
+            filters=filters,
+        )
+    finally:
+        router_stats.record(decision["route"], time.monotonic() - started)
 
-    hits = search_chunks(search_query, top_k=top_k)
+
+async def _rag_response_async(
+    query: str,
+    user_id: int,
+    db: Session,
+    top_k: int,
+    use_hyde: bool,
+    filters: Optional[Dict] = None,
+) -> str:
+    use_cache = _cacheable(query, filters)
+    summary, history = await run_in_threadpool(_conversation_for, db, user_id, use_cache)
+    filters = _resolve_filters(query, filters)
+    query_vector = None
+    if use_cache:
+        query_vector = (await embed_texts_async([query]))[0]
+        cached = semantic_cache.get(query_vector)
+        if cached:
+            await run_in_threadpool(save_exchange, db, user_id, query, cached["answer"])
+            return cached["answer"]
+
+    hits, hypothetical_answer = await _retrieve_async(
+        query, top_k, use_hyde, query_vector, filters
+    )
 
     if not hits:
-        answer = "I could not find relevant information about this topic in the MOSDAC database. The query may be outside the current dataset coverage or use different terminology than our documentation."
-        db.add(ChatContext(user_id=user_id, role="user", content=query))
-        db.add(ChatContext(user_id=user_id, role="assistant", content=answer))
-        db.commit()
+        answer = NO_CONTEXT_ANSWER
+        await run_in_threadpool(save_exchange, db, user_id, query, answer)
         return answer
 
-    prompt = build_enhanced_prompt(query, hits, history, hypothetical_answer)
+    messages = build_enhanced_prompt(
+        query, hits, history, hypothetical_answer, summary=summary
+    )
 
     try:
-        response = client.chat.completions.create(
-            model="gemini-2.5-flash",
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": query},
-            ],
+        answer = await complete_async(messages)
+    except Exception as e:
+        return f"I encountered a technical issue while processing your query: {str(e)}"
+
+    await run_in_threadpool(save_exchange, db, user_id, query, answer)
+    if use_cache:
+        semantic_cache.put(query_vector, query, answer, _source_metadata(hits))
+
+    return answer
+
+
+def _sse_event(event: str, data: Dict) -> str:
+    """
+    Format a single Server-Sent Event frame.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def chatbot_response_stream(
+    query: str,
+    user_id: int,
+    db: Session,
+    top_k: int = 5,
+    use_hyde: bool = True,
+    filters: Optional[Dict] = None,
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of chatbot_response producing Server-Sent Events.
+    Emits a `metadata` event as soon as retrieval finishes, then one `token`
+    event per LLM delta and a final `done` event. The assembled answer is
+    persisted once the stream has completed.
+    """
+    started = time.monotonic()
+    decision = _route(query, use_hyde)
+    try:
+        if decision["route"] == ROUTE_SMALLTALK:
+            await run_in_threadpool(save_exchange, db, user_id, query, decision["answer"])
+            yield _sse_event(
+                "metadata", {"sources": [], "hyde": False, "cached": False, "route": ROUTE_SMALLTALK}
+            )
+            yield _sse_event("token", {"content": decision["answer"]})
+            yield _sse_event("done", {"answer": decision["answer"]})
+            return
+
+        async for event in _rag_response_stream(
+            query,
+            user_id,
+            db,
+            top_k,
+            use_hyde=decision["route"] == ROUTE_HYDE,
+            filters=filters,
+        ):
+            yield event
+    finally:
+        router_stats.record(decision["route"], time.monotonic() - started)
+
+
+async def _rag_response_stream(
+    query: str,
+    user_id: int,
+    db: Session,
+    top_k: int,
+    use_hyde: bool,
+    filters: Optional[Dict] = None,
+) -> AsyncIterator[str]:
+    use_cache = _cacheable(query, filters)
+    summary, history = await run_in_threadpool(_conversation_for, db, user_id, use_cache)
+    filters = _resolve_filters(query, filters)
+    query_vector = None
+    if use_cache:
+        query_vector = (await embed_texts_async([query]))[0]
+        cached = semantic_cache.get(query_vector)
+        if cached:
+            await run_in_threadpool(save_exchange, db, user_id, query, cached["answer"])
+            yield _sse_event(
+                "metadata",
+                {
+                    "sources": cached["sources"],
+                    "hyde": False,
+                    "cached": True,
+                    "route": ROUTE_HYDE if use_hyde else ROUTE_DIRECT,
+                },
+            )
+            yield _sse_event("token", {"content": cached["answer"]})
+            yield _sse_event("done", {"answer": cached["answer"]})
+            return
+
+    hits, hypothetical_answer = await _retrieve_async(
+        query, top_k, use_hyde, query_vector, filters
+    )
+    sources = _source_metadata(hits)
+
+    yield _sse_event(
+        "metadata",
+        {
+            "sources": sources,
+            "hyde": hypothetical_answer is not None,
+            "cached": False,
+            "filters": filters,
+            "route": ROUTE_HYDE if use_hyde else ROUTE_DIRECT,
+        },
+    )
+
+    if not hits:
+        await run_in_threadpool(save_exchange, db, user_id, query, NO_CONTEXT_ANSWER)
+        yield _sse_event("token", {"content": NO_CONTEXT_ANSWER})
+        yield _sse_event("done", {"answer": NO_CONTEXT_ANSWER})
+        return
+
+    messages = build_enhanced_prompt(
+        query, hits, history, hypothetical_answer, summary=summary
+    )
+
+    parts = []
+    try:
+        stream = await async_client.chat.completions.create(
+            model=CHAT_MODEL,
+            messages=messages,
             temperature=0.1,
             max_tokens=1000,
+            stream=True,
         )
-        answer = response.choices[0].message.content.strip()
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield _sse_event("token", {"content": delta})
     except Exception as e:
-        return f"I encountered a technical issue while processing your query: {str(e)}"
+        yield _sse_event(
+            "error",
+            {
+                "detail": f"I encountered a technical issue while processing your query: {str(e)}"
+            },
+        )
+        return
 
-    db.add(ChatContext(user_id=user_id, role="user", content=query))
-    db.add(ChatContext(user_id=user_id, role="assistant", content=answer))
-    db.commit()
+    answer = "".join(parts).strip()
+    await run_in_threadpool(save_exchange, db, user_id, query, answer)
+    if use_cache:
+        semantic_cache.put(query_vector, query, answer, sources)
+    yield _sse_event("done", {"answer": answer})
 
-    return answer
+
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.monotonic() - started) * 1000, 1)
+
+
+async def chatbot_response_batch(
+    queries: List[str],
+    user_id: int,
+    db: Session,
+    top_k: int = 5,
+    use_hyde: bool = True,
+    concurrency: int = BATCH_LLM_CONCURRENCY,
+    filters: Optional[Dict] = None,
+    save_history: bool = False,
+) -> Dict:
+    """
+    Answer a list of queries with shared round-trips: HyDE texts are generated
+    concurrently, every search text is embedded in one embeddings request,
+    all searches go to Qdrant in one `search_batch`, and the completions run
+    with at most `concurrency` in flight.
+    Queries are answered independently of the user's conversation, so the
+    results do not depend on what the caller asked before; they are only
+    added to the chat history with `save_history`.
+    Returns {"results": [...], "timings": {...}} in input order.
+    """
+    batch_started = time.monotonic()
+    semaphore = asyncio.Semaphore(concurrency)
+    decisions = [_route(query, use_hyde) for query in queries]
+    results = [
+        {"query": query, "answer": None, "route": d["route"], "timings": {}}
+        for query, d in zip(queries, decisions)
+    ]
+    for result, decision in zip(results, decisions):
+        if decision["route"] == ROUTE_SMALLTALK:
+            result["answer"] = decision["answer"]
+            router_stats.record(decision["route"], time.monotonic() - batch_started)
+
+    rag = [i for i, r in enumerate(results) if r["answer"] is None]
+
+    # HyDE texts (cached or generated) for the queries routed to HyDE
+    stage = time.monotonic()
+    hypothetical_answers = {}
+    search_vectors = {}
+
+    async def hyde(i: int):
+        started = time.monotonic()
+        cached = None
+        if HYDE_CACHE_ENABLED:
+            cached = await run_in_threadpool(hyde_cache.get, queries[i], embedding_provider.model)
+        if cached:
+            hypothetical_answers[i], search_vectors[i] = cached
+        else:
+            async with semaphore:
+                hypothetical_answers[i] = await generate_hypothetical_answer_async(queries[i])
+        results[i]["timings"]["hyde_ms"] = _elapsed_ms(started)
+
+    await asyncio.gather(*(hyde(i) for i in rag if results[i]["route"] == ROUTE_HYDE))
+    hyde_ms = _elapsed_ms(stage)
+
+    # One embeddings request for everything not served from the HyDE cache
+    stage = time.monotonic()
+    to_embed = [i for i in rag if i not in search_vectors]
+    if to_embed:
+        vectors = await embed_texts_async(
+            [hypothetical_answers.get(i, queries[i]) for i in to_embed]
+        )
+        for i, vector in zip(to_embed, vectors):
+            search_vectors[i] = vector
+            if HYDE_CACHE_ENABLED and hypothetical_answers.get(i, queries[i]) != queries[i]:
+                await run_in_threadpool(
+                    hyde_cache.put, queries[i], embedding_provider.model, hypothetical_answers[i], vector
+                )
+    embedding_ms = _elapsed_ms(stage)
+
+    # One Qdrant search_batch request
+    stage = time.monotonic()
+    hit_lists = []
+    if rag:
+        hit_lists = await search_chunks_batch_async(
+            [search_vectors[i] for i in rag],
+            top_k=top_k,
+            filters_list=[_resolve_filters(queries[i], filters) for i in rag],
+            lexical_queries=[queries[i] for i in rag],
+        )
+    search_ms = _elapsed_ms(stage)
+
+    async def answer_query(i: int, hits: List[Dict]):
+        try:
+            if not hits:
+                results[i]["answer"] = NO_CONTEXT_ANSWER
+                return
+            messages = build_enhanced_prompt(
+                queries[i], hits, [], hypothetical_answers.get(i)
+            )
+            started = time.monotonic()
+            async with semaphore:
+                try:
+                    results[i]["answer"] = await complete_async(messages)
+                except Exception as e:
+                    results[i]["answer"] = f"I encountered a technical issue while processing your query: {str(e)}"
+            results[i]["timings"]["llm_ms"] = _elapsed_ms(started)
+        finally:
+            # Latency as seen by this query: the shared stages plus its own completion
+            router_stats.record(results[i]["route"], time.monotonic() - batch_started)
+
+    stage = time.monotonic()
+    await asyncio.gather(*(answer_query(i, hits) for i, hits in zip(rag, hit_lists)))
+    llm_ms = _elapsed_ms(stage)
+
+    def save_all():
+        for result in results:
+            db.add(ChatContext(user_id=user_id, role="user", content=result["query"]))
+            db.add(ChatContext(user_id=user_id, role="assistant", content=result["answer"]))
+        db.commit()
+
+    if save_history:
+        await run_in_threadpool(save_all)
+
+    return {
+        "results": results,
+        "timings": {
+            "hyde_ms": hyde_ms,
+            "embedding_ms": embedding_ms,
+            "search_ms": search_ms,
+            "llm_ms": llm_ms,
+            "total_ms": _elapsed_ms(batch_started),
+        },
+    }
 
 
 def chatbot_response_with_fallback(
@@ -0,0 +1,130 @@
+import os
+import threading
+from typing import Optional
+from dotenv import load_dotenv
+from openai import OpenAI
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.models.chat_context import ChatContext
+from app.models.chat_summary import ChatSummary
+
+load_dotenv()
+
+# Start summarizing once a user has more messages than this
+SUMMARY_THRESHOLD = int(os.getenv("SUMMARY_THRESHOLD", "8"))
+# Messages kept verbatim after the summary (two user/assistant turns)
+RECENT_MESSAGES = int(os.getenv("SUMMARY_RECENT_MESSAGES", "4"))
+MAX_MESSAGES_PER_UPDATE = 40
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gemini-2.5-flash")
+
+client = OpenAI(
+    api_key=os.getenv("GEMINI_API_KEY"),
+    base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+)
+
+_user_locks = {}
+_user_locks_guard = threading.Lock()
+
+
+def get_summary(db: Session, user_id: int) -> Optional[str]:
+    """
+    Return the rolling conversation summary of a user, if one exists.
+    """
+    row = db.query(ChatSummary.summary).filter(ChatSummary.user_id == user_id).first()
+    return row.summary if row else None
+
+
+def _summarize(previous_summary: Optional[str], messages) -> str:
+    transcript = "\n".join(
+        f"{'User' if m.role == 'user' else 'Assistant'}: {m.content}" for m in messages
+    )
+    prompt = f"""
+    Update the running summary of a conversation between a user and the MOSDAC assistant.
+    Keep the user's goals, the missions, datasets, parameters, regions and dates discussed,
+    and any open questions. Drop greetings and repeated details. Maximum 150 words.
+
+    Current summary:
+    {previous_summary or "(none)"}
+
+    New messages:
+    {transcript}
+
+    Updated summary:
+    """
+    response = client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": "You maintain compact conversation summaries."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.0,
+        max_tokens=300,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def update_summary(user_id: int):
+    """
+    Fold messages that left the recent window into the user's summary.
+    Meant to run as a background task after the answer has been returned;
+    uses its own DB session and is a no-op below SUMMARY_THRESHOLD.
+    """
+    with _user_locks_guard:
+        lock = _user_locks.setdefault(user_id, threading.Lock())
+    if not lock.acquire(blocking=False):
+        return  # another update for this user is already running
+
+    db = SessionLocal()
+    try:
+        recent = (
+            db.query(ChatContext.id)
+            .filter(ChatContext.user_id == user_id)
+            .order_by(ChatContext.id.desc())
+            .limit(SUMMARY_THRESHOLD + 1)
+            .all()
+        )
+        if len(recent) <= SUMMARY_THRESHOLD:
+            return
+
+        # Everything older than the verbatim window is summarized
+        boundary_id = recent[RECENT_MESSAGES - 1].id
+        row = db.query(ChatSummary).filter(ChatSummary.user_id == user_id).first()
+
+        # Folded oldest first in bounded steps, so a long unsummarized backlog
+        # cannot blow up the prompt, until the summary reaches the window
+        while True:
+            last_id = row.last_message_id if row else 0
+            pending = (
+                db.query(ChatContext)
+                .filter(
+                    ChatContext.user_id == user_id,
+                    ChatContext.id > last_id,
+                    ChatContext.id < boundary_id,
+                )
+                .order_by(ChatContext.id.asc())
+                .limit(MAX_MESSAGES_PER_UPDATE)
+                .all()
+            )
+            if not pending:
+                return
+
+            summary = _summarize(row.summary if row else None, pending)
+            if row:
+                row.summary = summary
+                row.last_message_id = pending[-1].id
+            else:
+                row = ChatSummary(
+                    user_id=user_id, summary=summary, last_message_id=pending[-1].id
+                )
+                db.add(row)
+            db.commit()
+
+    except IntegrityError:
+        db.rollback()
+    except Exception as e:
+        print(f"⚠️ Conversation summary update failed for user {user_id}: {e}")
+        db.rollback()
+    finally:
+        db.close()
+        lock.release()
@@ -0,0 +1,266 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from app.utils.storage import DATA_DIR
+
+load_dotenv()
+
+EMBEDDING_CACHE_DIR = os.getenv(
+    "EMBEDDING_CACHE_DIR", os.path.join(DATA_DIR, "embedding_cache")
+)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+# float16 halves disk and page-cache use; cosine ranking is unaffected in practice
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding store for one model, keyed by the hash of the
+    embedded text. Vectors are appended to a flat memory-mapped matrix
+    (`vectors.bin`); a SQLite index maps text hashes to matrix rows.
+    Rows are only reclaimed by `compact`.
+    """
+
+    def __init__(self, model: str, cache_dir: str = EMBEDDING_CACHE_DIR, dtype: str = EMBEDDING_CACHE_DTYPE):
+        self.model = model
+        self.dir = os.path.join(cache_dir, re.sub(r"[^\w.-]", "_", model))
+        self.dtype = np.dtype(dtype)
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._matrix = None
+        self._dim = None
+        self._generation = None
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.dir, "vectors.bin")
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.dir, exist_ok=True)
+            self._conn = sqlite3.connect(
+                os.path.join(self.dir, "index.sqlite3"), check_same_thread=False, timeout=30.0
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    text_hash TEXT PRIMARY KEY,
+                    row INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+            self._conn.commit()
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+            self._dim = int(row[0]) if row else None
+        return self._conn
+
+    def _rows(self, min_rows: int = 0) -> Optional[np.ndarray]:
+        """
+        Memory-mapped view of the vector matrix, remapped when another
+        writer has appended rows beyond the current view.
+        """
+        if self._matrix is not None and len(self._matrix) >= min_rows:
+            return self._matrix
+        if not self._dim or not os.path.exists(self.vectors_path):
+            return None
+        rows = os.path.getsize(self.vectors_path) // (self._dim * self.dtype.itemsize)
+        if rows == 0:
+            return None
+        self._matrix = np.memmap(
+            self.vectors_path, dtype=self.dtype, mode="r", shape=(rows, self._dim)
+        )
+        return self._matrix
+
+    def _lookup(self, conn: sqlite3.Connection, hashes: List[str]) -> Dict[str, int]:
+        found = {}
+        unique = list(set(hashes))
+        for i in range(0, len(unique), 500):
+            part = unique[i : i + 500]
+            found.update(
+                conn.execute(
+                    f"SELECT text_hash, row FROM embeddings WHERE text_hash IN ({','.join('?' * len(part))})",
+                    part,
+                ).fetchall()
+            )
+        return found
+
+    def _check_generation(self, conn: sqlite3.Connection):
+        # compact() renumbers rows; drop a mapping made before it ran
+        row = conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        generation = row[0] if row else "0"
+        if generation != self._generation:
+            self._matrix = None
+            self._generation = generation
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Cached embeddings for texts, None where the text is not cached.
+        """
+        hashes = [text_hash(t) for t in texts]
+        try:
+            with self._lock:
+                conn = self._connection()
+                self._check_generation(conn)
+                found = self._lookup(conn, hashes)
+                matrix = self._rows(max(found.values()) + 1) if found else None
+                if found:
+                    conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE text_hash = ?",
+                        [(time.time(), h) for h in found],
+                    )
+                    conn.commit()
+        except sqlite3.Error as e:
+            print(f"Embedding cache read failed: {e}")
+            return [None] * len(texts)
+
+        results = []
+        for h in hashes:
+            row = found.get(h)
+            if row is None or matrix is None or row >= len(matrix):
+                results.append(None)
+            else:
+                results.append(np.asarray(matrix[row], dtype=np.float32).tolist())
+        self.hits += sum(r is not None for r in results)
+        self.misses += sum(r is None for r in results)
+        return results
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]):
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        keep = vectors.any(axis=1)  # never persist dummy (zero) embeddings
+        if not keep.any():
+            return
+        hashes = [text_hash(t) for t, k in zip(texts, keep) if k]
+        vectors = vectors[keep]
+
+        try:
+            with self._lock:
+                conn = self._connection()
+                # The write lock also serializes appends to vectors.bin
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if self._dim is None:
+                        row = conn.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()
+                        self._dim = int(row[0]) if row else vectors.shape[1]
+                        conn.execute(
+                            "INSERT OR IGNORE INTO meta VALUES ('dim', ?)", (str(self._dim),)
+                        )
+                    if vectors.shape[1] != self._dim:
+                        raise ValueError(
+                            f"dimension {vectors.shape[1]} does not match cache dimension {self._dim}"
+                        )
+
+                    new = {}
+                    for h, vector in zip(hashes, vectors):
+                        new.setdefault(h, vector)
+                    existing = self._lookup(conn, list(new))
+                    new = {h: v for h, v in new.items() if h not in existing}
+                    if not new:
+                        conn.rollback()
+                        return
+                    self._check_generation(conn)
+
+                    row_bytes = self._dim * self.dtype.itemsize
+                    size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+                    first_row = size // row_bytes
+                    with open(self.vectors_path, "r+b" if size else "wb") as f:
+                        f.seek(first_row * row_bytes)  # drop any torn partial row
+                        f.write(np.stack(list(new.values())).astype(self.dtype).tobytes())
+                    now = time.time()
+                    conn.executemany(
+                        "INSERT INTO embeddings VALUES (?, ?, ?)",
+                        [(h, first_row + i, now) for i, h in enumerate(new)],
+                    )
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+        except (sqlite3.Error, OSError, ValueError) as e:
+            print(f"Embedding cache write failed: {e}")
+
+    def compact(self, max_entries: Optional[int] = None, max_age_seconds: Optional[float] = None) -> Dict:
+        """
+        Evict entries unused for `max_age_seconds` and the least recently
+        used beyond `max_entries`, then rewrite the matrix without the
+        freed rows.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                if max_age_seconds is not None:
+                    conn.execute(
+                        "DELETE FROM embeddings WHERE last_used < ?",
+                        (time.time() - max_age_seconds,),
+                    )
+                if max_entries is not None:
+                    conn.execute(
+                        """
+                        DELETE FROM embeddings WHERE text_hash IN (
+                            SELECT text_hash FROM embeddings ORDER BY last_used DESC
+                            LIMIT -1 OFFSET ?
+                        )
+                        """,
+                        (max_entries,),
+                    )
+                live = conn.execute("SELECT text_hash, row FROM embeddings ORDER BY row").fetchall()
+
+                matrix = self._rows(live[-1][1] + 1) if live else None
+                tmp_path = f"{self.vectors_path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    if matrix is not None:
+                        for start in range(0, len(live), 10000):
+                            rows = [r for _, r in live[start : start + 10000]]
+                            f.write(np.asarray(matrix[rows]).tobytes())
+                conn.executemany(
+                    "UPDATE embeddings SET row = ? WHERE text_hash = ?",
+                    [(i, h) for i, (h, _) in enumerate(live)],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (str(time.time_ns()),)
+                )
+                self._matrix = None
+                os.replace(tmp_path, self.vectors_path)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        return {"entries_before": before, "entries_after": len(live)}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            try:
+                entries = self._connection().execute(
+                    "SELECT COUNT(*) FROM embeddings"
+                ).fetchone()[0]
+            except sqlite3.Error:
+                entries = None
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model,
+                "entries": entries,
+                "dtype": self.dtype.name,
+                "bytes": os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
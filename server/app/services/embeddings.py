@@ -1,22 +1,293 @@
 import os
-from openai import OpenAI
+import time
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from openai import (
+    OpenAI,
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
 from dotenv import load_dotenv
+from starlette.concurrency import run_in_threadpool
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+from app.services.singleflight import SingleFlight
+from app.services.embedding_cache import EmbeddingCache, EMBEDDING_CACHE_ENABLED
+from app.services.local_embeddings import LocalHashEmbedder
 
 load_dotenv()
 
 # Make OpenAI client optional - only initialize if API key is provided
 openai_api_key = os.getenv("OPENAI_API_KEY")
 client = OpenAI(api_key=openai_api_key) if openai_api_key and openai_api_key != "your_openai_api_key_here_optional" else None
+async_client = AsyncOpenAI(api_key=openai_api_key) if client else None
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+OPENAI_EMBEDDING_DIM = 1536
 
-def embed_texts(texts):
+# "openai" or "local" (CPU-only hashed n-gram embeddings, no network)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai" if client else "local")
+LOCAL_EMBEDDING_DIM = int(os.getenv("LOCAL_EMBEDDING_DIM", "384"))
+
+# Request limits for bulk embedding (API caps: 2048 inputs, ~300k tokens,
+# 8191 tokens per input)
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "100000"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+MAX_INPUT_TOKENS = 8191
+
+# Throughput of the last bulk embed_texts run
+last_run_stats = {}
+
+# Identical concurrent embedding requests share one API call
+embedding_flight = SingleFlight("embeddings")
+
+
+def _flight_key(texts) -> str:
+    digest = hashlib.sha1(EMBEDDING_MODEL.encode())
+    for text in texts:
+        digest.update(b"\x00" + text.encode())
+    return digest.hexdigest()
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _make_batches(texts, max_items: int, max_tokens: int):
+    """
+    Split texts into (start, batch) pairs bounded by item count and
+    estimated token size; inputs over the per-input limit are truncated.
+    """
+    batches, current, current_tokens, start = [], [], 0, 0
+    for i, text in enumerate(texts):
+        if _estimate_tokens(text) > MAX_INPUT_TOKENS:
+            text = text[: MAX_INPUT_TOKENS * 4 - 4]
+        tokens = _estimate_tokens(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append((start, current))
+            current, current_tokens, start = [], 0, i
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        batches.append((start, current))
+    return batches
+
+
+def _wait_for_retry(retry_state) -> float:
     """
-    Convert list of texts into embeddings.
+    Honour the Retry-After header of rate-limit responses, otherwise back
+    off exponentially.
     """
-    if not client:
-        # Return empty embeddings or raise error if OpenAI is not configured
-        print("Warning: OpenAI API key not configured. Embeddings disabled.")
-        return [[0.0] * 1536 for _ in texts]  # Return dummy embeddings
-    
-    response = client.embeddings.create(model="text-embedding-3-small", input=texts)
+    error = retry_state.outcome.exception()
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return wait_exponential(multiplier=1, min=1, max=60)(retry_state)
+
+
+@retry(
+    retry=retry_if_exception_type(
+        (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+    ),
+    wait=_wait_for_retry,
+    stop=stop_after_attempt(6),
+    reraise=True,
+)
+def _embed_batch(texts):
+    response = client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
+    usage = getattr(response, "usage", None)
+    tokens = usage.total_tokens if usage else sum(_estimate_tokens(t) for t in texts)
+    return [item.embedding for item in response.data], tokens
+
+
+def _embed_bulk(texts, batches):
+    """
+    Embed batches concurrently (EMBED_CONCURRENCY), retrying each batch on
+    transient errors, and return the embeddings in input order.
+    """
+    global last_run_stats
+    started = time.time()
+    embeddings = [None] * len(texts)
+    total_tokens = 0
+
+    with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as executor:
+        futures = {
+            executor.submit(_embed_batch, batch): (start, len(batch))
+            for start, batch in batches
+        }
+        for future, (start, size) in futures.items():
+            vectors, tokens = future.result()
+            embeddings[start : start + size] = vectors
+            total_tokens += tokens
+
+    elapsed = max(time.time() - started, 1e-6)
+    last_run_stats = {
+        "texts": len(texts),
+        "batches": len(batches),
+        "tokens": total_tokens,
+        "seconds": elapsed,
+        "texts_per_second": len(texts) / elapsed,
+        "tokens_per_second": total_tokens / elapsed,
+    }
+    print(
+        f"✅ Embedded {len(texts)} texts in {len(batches)} batches, {elapsed:.2f}s "
+        f"({last_run_stats['texts_per_second']:.1f} texts/s, "
+        f"{last_run_stats['tokens_per_second']:.0f} tokens/s)"
+    )
+    return embeddings
+
+
+@retry(
+    retry=retry_if_exception_type(
+        (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+    ),
+    wait=_wait_for_retry,
+    stop=stop_after_attempt(6),
+    reraise=True,
+)
+async def _embed_batch_async(texts):
+    response = await async_client.embeddings.create(model=EMBEDDING_MODEL, input=texts)
     return [item.embedding for item in response.data]
+
+
+def _embed_single(batch):
+    return _embed_batch(batch)[0]
+
+
+def _embed_uncached(texts):
+    batches = _make_batches(texts, EMBED_BATCH_SIZE, EMBED_BATCH_TOKENS)
+    if len(batches) > 1:
+        return _embed_bulk(texts, batches)
+
+    # A single request (e.g. a query) is shared with identical concurrent ones
+    return embedding_flight.do(_flight_key(texts), _embed_single, batches[0][1])
+
+
+async def _embed_uncached_async(texts):
+    """
+    Same batching, truncation and retries as _embed_uncached, with at most
+    EMBED_CONCURRENCY batch requests in flight.
+    """
+    batches = _make_batches(texts, EMBED_BATCH_SIZE, EMBED_BATCH_TOKENS)
+    semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+    async def embed_batch(batch):
+        async with semaphore:
+            return await _embed_batch_async(batch)
+
+    results = await asyncio.gather(*(embed_batch(batch) for _, batch in batches))
+    return [vector for vectors in results for vector in vectors]
+
+
+class EmbeddingProvider(ABC):
+    """
+    Embedding backend interface. `model` identifies the vector space:
+    vectors from different models must never be mixed in one collection.
+    """
+
+    name: str
+    model: str
+    dimension: int
+    # Worth persisting in the embedding cache (remote, paid calls)
+    cacheable: bool = False
+
+    @abstractmethod
+    def embed(self, texts):
+        ...
+
+    async def embed_async(self, texts):
+        return self.embed(texts)
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    name = "openai"
+    model = EMBEDDING_MODEL
+    dimension = OPENAI_EMBEDDING_DIM
+    cacheable = True
+
+    def embed(self, texts):
+        return _embed_uncached(texts)
+
+    async def embed_async(self, texts):
+        return await embedding_flight.do_async(
+            _flight_key(texts), _embed_uncached_async, texts
+        )
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    name = "local"
+
+    def __init__(self, dimension: int = LOCAL_EMBEDDING_DIM):
+        self.embedder = LocalHashEmbedder(dimension)
+        self.dimension = dimension
+        self.model = f"local-hash-ngram-{dimension}"
+
+    def embed(self, texts):
+        return self.embedder.embed(texts).tolist()
+
+
+def get_embedding_provider(name: str = EMBEDDING_PROVIDER) -> EmbeddingProvider:
+    if name == "openai":
+        if not client:
+            print("Warning: OpenAI API key not configured. Using local embeddings.")
+            return LocalEmbeddingProvider()
+        return OpenAIEmbeddingProvider()
+    if name == "local":
+        return LocalEmbeddingProvider()
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {name}")
+
+
+embedding_provider = get_embedding_provider()
+
+# Embeddings of previously seen texts (re-ingestion only embeds changed chunks)
+embedding_cache = EmbeddingCache(embedding_provider.model)
+
+
+def embed_texts(texts):
+    """
+    Convert list of texts into embeddings with the configured provider.
+    Texts already in the embedding cache are not sent to the API. Large
+    inputs are split by item count and token size and embedded
+    concurrently with retries; output order matches input order.
+    """
+    if not EMBEDDING_CACHE_ENABLED or not embedding_provider.cacheable:
+        return embedding_provider.embed(texts)
+
+    embeddings = embedding_cache.get_many(texts)
+    missing = [i for i, vector in enumerate(embeddings) if vector is None]
+    if missing:
+        fresh = embedding_provider.embed([texts[i] for i in missing])
+        embedding_cache.put_many([texts[i] for i in missing], fresh)
+        for i, vector in zip(missing, fresh):
+            embeddings[i] = vector
+    return embeddings
+
+
+async def embed_texts_async(texts):
+    """
+    Async variant of embed_texts.
+    """
+    if not EMBEDDING_CACHE_ENABLED or not embedding_provider.cacheable:
+        return await embedding_provider.embed_async(texts)
+
+    embeddings = await run_in_threadpool(embedding_cache.get_many, texts)
+    missing = [i for i, vector in enumerate(embeddings) if vector is None]
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        fresh = await embedding_provider.embed_async(missing_texts)
+        await run_in_threadpool(embedding_cache.put_many, missing_texts, fresh)
+        for i, vector in zip(missing, fresh):
+            embeddings[i] = vector
+    return embeddings
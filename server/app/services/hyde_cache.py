@@ -0,0 +1,152 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from dotenv import load_dotenv
+from app.utils.storage import DATA_DIR
+
+load_dotenv()
+
+
+def normalize_query(query: str) -> str:
+    """
+    Fold case, punctuation and whitespace so trivially different spellings
+    of the same question share a cache entry.
+    """
+    folded = re.sub(r"[^\w\s]", " ", query.lower())
+    return re.sub(r"\s+", " ", folded).strip()
+
+
+class HydeCache:
+    """
+    On-disk (SQLite) memo of HyDE hypothetical answers and their embeddings,
+    keyed by embedding model and normalized query text, so vectors from
+    another model are never returned. Survives restarts and is shared by
+    every worker process on the host.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl_seconds: int = 7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS hyde_cache (
+                    query_key TEXT PRIMARY KEY,
+                    hypothetical_answer TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_hyde_cache_last_used ON hyde_cache (last_used)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _key(query: str, model: str) -> str:
+        return f"{model}:{normalize_query(query)}"
+
+    def get(self, query: str, model: str) -> Optional[Tuple[str, List[float]]]:
+        """
+        Return (hypothetical_answer, embedding) for the query, or None.
+        """
+        key = self._key(query, model)
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT hypothetical_answer, embedding, created_at FROM hyde_cache WHERE query_key = ?",
+                    (key,),
+                ).fetchone()
+
+                if row is None or row[2] + self.ttl_seconds <= now:
+                    if row is not None:
+                        conn.execute("DELETE FROM hyde_cache WHERE query_key = ?", (key,))
+                        conn.commit()
+                    self.misses += 1
+                    return None
+
+                conn.execute(
+                    "UPDATE hyde_cache SET last_used = ? WHERE query_key = ?", (now, key)
+                )
+                conn.commit()
+                self.hits += 1
+        except sqlite3.Error as e:
+            print(f"HyDE cache read failed: {e}")
+            return None
+
+        return row[0], np.frombuffer(row[1], dtype=np.float32).tolist()
+
+    def put(self, query: str, model: str, hypothetical_answer: str, embedding: List[float]):
+        vector = np.asarray(embedding, dtype=np.float32)
+        if not vector.any():
+            # Dummy embeddings (no API key) must not be persisted
+            return
+
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO hyde_cache VALUES (?, ?, ?, ?, ?)",
+                    (self._key(query, model), hypothetical_answer, vector.tobytes(), now, now),
+                )
+                conn.execute(
+                    "DELETE FROM hyde_cache WHERE created_at <= ?", (now - self.ttl_seconds,)
+                )
+                conn.execute(
+                    """
+                    DELETE FROM hyde_cache WHERE query_key IN (
+                        SELECT query_key FROM hyde_cache ORDER BY last_used DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_entries,),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"HyDE cache write failed: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            try:
+                entries = self._connection().execute(
+                    "SELECT COUNT(*) FROM hyde_cache"
+                ).fetchone()[0]
+            except sqlite3.Error:
+                entries = None
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+hyde_cache = HydeCache(
+    path=os.getenv("HYDE_CACHE_PATH", os.path.join(DATA_DIR, "hyde_cache.sqlite3")),
+    max_entries=int(os.getenv("HYDE_CACHE_SIZE", "10000")),
+    ttl_seconds=int(os.getenv("HYDE_CACHE_TTL", str(7 * 24 * 3600))),
+)
+HYDE_CACHE_ENABLED = os.getenv("HYDE_CACHE_ENABLED", "true").lower() == "true"
@@ -0,0 +1,52 @@
+import re
+import zlib
+from typing import List
+import numpy as np
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def _grams(text: str, char_ngrams=(3, 4, 5)) -> List[str]:
+    """
+    Word unigrams and bigrams plus character n-grams of each word (with
+    boundary markers), so "INSAT-3DR" and "insat 3dr" land close together.
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    grams = [f"w:{w}" for w in words]
+    grams.extend(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        for n in char_ngrams:
+            grams.extend(f"c:{padded[i : i + n]}" for i in range(len(padded) - n + 1))
+    return grams
+
+
+class LocalHashEmbedder:
+    """
+    Network-free embeddings: signed feature hashing of word and character
+    n-grams into `dimension` buckets, sublinear term frequency and L2
+    normalization. Deterministic across processes and machines.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        rows, hashes = [], []
+        for row, text in enumerate(texts):
+            grams = _grams(text)
+            rows.append(np.full(len(grams), row, dtype=np.int64))
+            hashes.append(np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.int64, count=len(grams)))
+
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        if not texts:
+            return matrix
+        rows = np.concatenate(rows)
+        hashes = np.concatenate(hashes)
+        # Low bits pick the bucket, a high bit the sign (limits collision bias)
+        signs = np.where((hashes >> 31) & 1, -1.0, 1.0).astype(np.float32)
+        np.add.at(matrix, (rows, hashes % self.dimension), signs)
+
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
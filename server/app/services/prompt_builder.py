@@ -0,0 +1,213 @@
+import os
+import re
+from typing import Dict, List
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Token budget for the dynamic part of the prompt (context, history, query)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+# Share of the budget history may use before retrieved context is trimmed
+HISTORY_BUDGET_SHARE = 0.25
+# Word-shingle Jaccard similarity above which two chunks count as duplicates
+DUPLICATE_THRESHOLD = 0.8
+
+# Static instructions, sent as the first message and never interpolated so the
+# prefix stays byte-identical across requests (provider-side prompt caching)
+SYSTEM_PROMPT = """
+# MOSDAC Expert Assistant
+
+## ROLE & PURPOSE
+You are an AI assistant specialized in MOSDAC (Meteorological and Oceanographic Satellite Data Archival Centre) datasets, satellite missions, and remote sensing data. Your primary role is to provide accurate, technical information about MOSDAC's data products and services.
+
+## CONVERSATION EXAMPLES
+Here are some example interactions to guide your responses:
+
+**User:** "Hi" or "Hello"
+**Assistant:** "Hello! I'm your MOSDAC AI assistant. How can I help you with satellite data, weather information, or ocean monitoring today?"
+
+**User:** "What can you help me with?"
+**Assistant:** "I can help you with various MOSDAC services including satellite datasets (OCM, SCATSAT-1, INSAT-3D), weather data, ocean state parameters, and data download assistance. What specific information are you looking for?"
+
+**User:** "Tell me about weather data"
+**Assistant:** "MOSDAC provides comprehensive weather data from multiple satellite missions. I can help you understand available parameters, temporal coverage, spatial resolution, and data access methods. What specific weather parameter interests you?"
+
+**User:** "How do I download data?"
+**Assistant:** "MOSDAC offers various data download options through their portal. I can guide you through the download process, explain data formats, and help you select the right datasets for your needs. What type of data are you looking to download?"
+
+## CONTEXT & GROUNDING
+The next message contains the information retrieved for the current query: context from the MOSDAC database and the recent conversation. If a hypothetical answer was used to guide retrieval, use it only to understand the query intent and verify all facts against the retrieved context.
+
+## RESPONSE GUIDELINES
+
+### CONVERSATIONAL APPROACH:
+- For greetings, respond warmly and offer specific help
+- For general questions, provide overview and ask for specifics
+- Maintain a helpful, professional tone throughout
+
+### DATA SPECIFICITY:
+- Reference specific satellite missions (OCM, SCATSAT-1, INSAT-3D, etc.)
+- Mention precise parameters (SST, Chlorophyll, Wind Vectors, Aerosols, etc.)
+- Include temporal and spatial coverage details when available
+- Reference specific data products and their applications
+
+### RESPONSE STRUCTURE:
+1. Start with a direct answer to the core question
+2. Provide supporting details from the context
+3. Mention data sources and their relevance
+4. Suggest related datasets or parameters when appropriate
+
+### QUALITY ASSURANCE:
+- Base answers STRICTLY on the provided context
+- If information is incomplete, acknowledge limitations
+- For technical queries, maintain scientific accuracy
+- Cross-reference multiple context chunks when available
+
+### HANDLING UNCERTAINTY:
+If the context doesn't contain sufficient information, respond with:
+"I could not find specific information about this in the current MOSDAC data. The available context covers [mention what IS available], but doesn't address your specific question about [mention the gap]."
+""".strip()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token for English text).
+    """
+    return len(text) // 4 + 1
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return f"{cut} ..."
+
+
+def _shingles(text: str, size: int = 3) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def merge_adjacent_chunks(chunks: List[Dict]) -> List[Dict]:
+    """
+    Join chunks of the same url with consecutive chunk_ids into one chunk,
+    keeping the best score. Output is ordered by score, best first.
+    """
+    by_url: Dict[str, List[Dict]] = {}
+    for chunk in chunks:
+        by_url.setdefault(chunk.get("url", ""), []).append(chunk)
+
+    merged = []
+    for url_chunks in by_url.values():
+        ordered = sorted(url_chunks, key=lambda c: c.get("chunk_id") or 0)
+        current = dict(ordered[0])
+        last_id = current.get("chunk_id")
+        for chunk in ordered[1:]:
+            next_id = chunk.get("chunk_id")
+            if last_id is not None and next_id is not None and next_id - last_id == 1:
+                current["content"] = f"{current['content']} {chunk['content']}"
+                current["score"] = max(current.get("score") or 0, chunk.get("score") or 0)
+            else:
+                merged.append(current)
+                current = dict(chunk)
+            last_id = next_id
+        merged.append(current)
+
+    return sorted(merged, key=lambda c: c.get("score") or 0, reverse=True)
+
+
+def dedupe_chunks(chunks: List[Dict], threshold: float = DUPLICATE_THRESHOLD) -> List[Dict]:
+    """
+    Drop chunks whose word shingles overlap an already kept (higher scored)
+    chunk by more than `threshold` Jaccard similarity.
+    """
+    kept, kept_shingles = [], []
+    for chunk in sorted(chunks, key=lambda c: c.get("score") or 0, reverse=True):
+        shingles = _shingles(chunk.get("content", ""))
+        if any(
+            len(shingles & other) / max(len(shingles | other), 1) >= threshold
+            for other in kept_shingles
+        ):
+            continue
+        kept.append(chunk)
+        kept_shingles.append(shingles)
+    return kept
+
+
+def _format_chunk(i: int, chunk: Dict, content: str) -> str:
+    source = chunk.get("title") or chunk.get("url") or "Unknown"
+    # Contexts are listed best first; the raw score (cosine, BM25 or fused)
+    # is not comparable across retrieval paths, so it is not shown
+    return f"[Context {i} - Source: {source} ({chunk.get('url', '')})]\n{content}\n"
+
+
+def build_context_message(
+    query: str,
+    context_chunks: List[Dict],
+    history_lines: List[str],
+    hypothetical_answer: str = None,
+    token_budget: int = PROMPT_TOKEN_BUDGET,
+    summary: str = None,
+) -> str:
+    """
+    Assemble the dynamic part of the prompt within `token_budget`.
+    Retrieved context has priority over history: history (the rolling
+    summary, then recent messages) may use at most HISTORY_BUDGET_SHARE of
+    the budget and is kept newest first; chunks are added best first and the
+    last one that does not fit is truncated.
+    """
+    query_section = f"## CURRENT QUERY ANALYSIS:\nUser wants to know: {query}\n\nNow provide a comprehensive, technically accurate response:"
+    hyde_note = (
+        "### HYPOTHETICAL ANSWER ANALYSIS:\nA hypothetical answer was generated to guide retrieval. Use this for understanding the query intent but verify all facts against the actual context above.\n"
+        if hypothetical_answer
+        else ""
+    )
+    remaining = token_budget - estimate_tokens(query_section) - estimate_tokens(hyde_note)
+
+    history_budget = int(token_budget * HISTORY_BUDGET_SHARE)
+    summary_text = ""
+    if summary:
+        summary_text = _truncate_to_tokens(
+            f"Summary of earlier conversation: {summary}\n", history_budget // 2
+        )
+        history_budget -= estimate_tokens(summary_text)
+    kept_history = []
+    for line in reversed(history_lines):
+        cost = estimate_tokens(line)
+        if cost > history_budget:
+            if history_budget > 50:
+                kept_history.insert(0, _truncate_to_tokens(line, history_budget))
+            break
+        kept_history.insert(0, line)
+        history_budget -= cost
+    history_text = summary_text + (
+        "\n".join(kept_history) if kept_history else "No recent conversation history."
+    )
+    remaining -= estimate_tokens(history_text)
+
+    context_parts = []
+    for chunk in dedupe_chunks(merge_adjacent_chunks(context_chunks)):
+        if remaining <= 50:
+            break
+        content = chunk.get("content", "")
+        block = _format_chunk(len(context_parts) + 1, chunk, content)
+        if estimate_tokens(block) > remaining:
+            block = _format_chunk(
+                len(context_parts) + 1, chunk, _truncate_to_tokens(content, remaining - 30)
+            )
+        context_parts.append(block)
+        remaining -= estimate_tokens(block)
+
+    return (
+        "### RETRIEVED CONTEXT FROM MOSDAC DATABASE:\n"
+        + "\n".join(context_parts)
+        + "\n### CONVERSATION CONTEXT:\n"
+        + history_text
+        + "\n\n"
+        + hyde_note
+        + "\n"
+        + query_section
+    )
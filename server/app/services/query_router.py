@@ -0,0 +1,138 @@
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+QUERY_ROUTER_ENABLED = os.getenv("QUERY_ROUTER_ENABLED", "true").lower() == "true"
+
+ROUTE_SMALLTALK = "smalltalk"  # canned answer, no retrieval
+ROUTE_DIRECT = "direct"  # embed the query itself, skip HyDE
+ROUTE_HYDE = "hyde"  # full HyDE RAG
+
+CANNED_ANSWERS = {
+    "greeting": "Hello! I'm your MOSDAC AI assistant. How can I help you with satellite data, weather information, or ocean monitoring today?",
+    "capabilities": "I can help you with various MOSDAC services including satellite datasets (OCM, SCATSAT-1, INSAT-3D), weather data, ocean state parameters, and data download assistance. What specific information are you looking for?",
+    "thanks": "You're welcome! Let me know if you need anything else about MOSDAC data or services.",
+    "goodbye": "Goodbye! Feel free to come back any time you need help with MOSDAC data.",
+}
+
+SMALLTALK_RULES = [
+    ("greeting", re.compile(r"^(hi+|hello+|hey+|hii+|namaste|good (morning|afternoon|evening))( there)?[\s!.?]*$")),
+    ("capabilities", re.compile(r"^(what can you (do|help( me)? with)|how can you help( me)?|help|who are you|what are you)[\s!.?]*$")),
+    ("thanks", re.compile(r"^(thanks?( you)?|thank you( so much| very much)?|thx|ok(ay)? thanks?)[\s!.?]*$")),
+    ("goodbye", re.compile(r"^(bye+|goodbye|see you|good night)[\s!.?]*$")),
+]
+
+# Mission, sensor and product identifiers that dense search on the raw query
+# already matches well; HyDE adds little for these lookups
+IDENTIFIER_PATTERN = re.compile(
+    r"\b(insat[- ]?3d[rs]?|insat|scatsat[- ]?1?|oceansat[- ]?[23]?|ocm[- ]?[23]?|megha[- ]?tropiques|saral|kalpana[- ]?1?|"
+    r"l[1-4][abc]?|sst|olr|ctbt|imager|sounder|altika|hdf5?|netcdf|geotiff)\b"
+)
+
+# Prototype queries for the vectorized scorer
+PROTOTYPES = {
+    ROUTE_DIRECT: [
+        "insat 3d imager product",
+        "scatsat 1 wind data",
+        "oceansat 2 ocm chlorophyll",
+        "sst product download",
+        "l2b data format",
+        "dataset id",
+        "data format hdf5",
+        "spatial resolution",
+        "list of products",
+        "contact mosdac",
+    ],
+    ROUTE_HYDE: [
+        "how does the satellite measure sea surface temperature",
+        "explain how cyclone tracking works using satellite data",
+        "why is ocean colour data useful for fisheries",
+        "what is the difference between two sensors",
+        "how can i use this data for monsoon research",
+        "describe the applications of scatterometer winds",
+        "what are the limitations of the retrieval algorithm",
+        "compare rainfall estimates from different missions",
+    ],
+}
+
+_FEATURES = 512
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _featurize(texts: List[str]) -> np.ndarray:
+    """
+    Hashed bag of unigrams and bigrams, L2-normalized rows.
+    """
+    matrix = np.zeros((len(texts), _FEATURES), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = _tokens(text)
+        for gram in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            matrix[row, zlib.crc32(gram.encode()) % _FEATURES] += 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+_ROUTES = list(PROTOTYPES)
+_CENTROIDS = np.stack([_featurize(PROTOTYPES[route]).mean(axis=0) for route in _ROUTES])
+_CENTROIDS /= np.linalg.norm(_CENTROIDS, axis=1, keepdims=True)
+
+
+def route_query(query: str, allow_hyde: bool = True) -> Dict:
+    """
+    Classify a query locally (no network) into a route.
+    Returns {"route", "reason", "answer"}; `answer` is only set for small talk.
+    """
+    normalized = re.sub(r"\s+", " ", query.lower()).strip()
+
+    for intent, pattern in SMALLTALK_RULES:
+        if pattern.match(normalized):
+            return {"route": ROUTE_SMALLTALK, "reason": intent, "answer": CANNED_ANSWERS[intent]}
+
+    if not allow_hyde:
+        return {"route": ROUTE_DIRECT, "reason": "hyde_disabled", "answer": None}
+
+    words = _tokens(normalized)
+    if len(words) <= 4 or (IDENTIFIER_PATTERN.search(normalized) and len(words) <= 8):
+        return {"route": ROUTE_DIRECT, "reason": "keyword_lookup", "answer": None}
+
+    scores = _CENTROIDS @ _featurize([normalized])[0]
+    route = _ROUTES[int(np.argmax(scores))]
+    return {"route": route, "reason": f"scorer:{float(scores.max()):.2f}", "answer": None}
+
+
+class RouterStats:
+    """
+    Per-route request counts and cumulative latency.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {ROUTE_SMALLTALK: 0, ROUTE_DIRECT: 0, ROUTE_HYDE: 0}
+        self._latency = {ROUTE_SMALLTALK: 0.0, ROUTE_DIRECT: 0.0, ROUTE_HYDE: 0.0}
+
+    def record(self, route: str, seconds: float):
+        with self._lock:
+            self._counts[route] += 1
+            self._latency[route] += seconds
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                route: {
+                    "requests": count,
+                    "avg_latency_ms": 1000 * self._latency[route] / count if count else 0.0,
+                }
+                for route, count in self._counts.items()
+            }
+
+
+router_stats = RouterStats()
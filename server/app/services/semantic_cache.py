@@ -0,0 +1,164 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from app.vector_db.qdrant_client import get_index_version
+
+load_dotenv()
+
+# Words that point back at earlier turns ("what about its resolution?",
+# "and the other one?"); such follow-ups need the conversation to answer
+CONTEXT_REFERENCE_PATTERN = re.compile(
+    r"\b(it|its|they|them|their|this|that|these|those|he|she|him|her|his|"
+    r"above|previous(ly)?|earlier|former|latter|same|again|more|else)\b"
+    r"|^(and|but|so|also|then|what about|how about)\b"
+)
+
+
+def is_self_contained(query: str) -> bool:
+    """
+    True when the query can be answered without the conversation before it,
+    i.e. it contains no pronouns or references to earlier turns.
+    """
+    return not CONTEXT_REFERENCE_PATTERN.search(re.sub(r"\s+", " ", query.lower()).strip())
+
+
+class SemanticCache:
+    """
+    In-memory answer cache keyed by query embedding.
+    A lookup hits when a cached query lies within `max_distance` cosine
+    distance of the new one. Entries expire after `ttl_seconds` and the
+    least recently used entry is evicted once `max_entries` is reached.
+    The cache is cleared whenever the vector index is rebuilt.
+    """
+
+    def __init__(
+        self, max_entries: int = 1000, ttl_seconds: int = 3600, max_distance: float = 0.08
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim), unit rows
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()  # slot -> entry
+        self._free_slots: List[int] = list(range(max_entries))
+        self._index_version = get_index_version()
+
+    def _normalize(self, vector) -> Optional[np.ndarray]:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        if norm == 0:
+            # Dummy embeddings (no API key) carry no meaning, never cache them
+            return None
+        return v / norm
+
+    def _check_index_version(self):
+        version = get_index_version()
+        if version != self._index_version:
+            self._clear()
+            self._index_version = version
+
+    def _clear(self):
+        self._entries.clear()
+        self._free_slots = list(range(self.max_entries))
+
+    def _remove(self, slot: int):
+        del self._entries[slot]
+        self._free_slots.append(slot)
+
+    def get(self, vector) -> Optional[Dict]:
+        """
+        Return the cached entry {query, answer, sources} closest to `vector`,
+        or None when nothing is close enough.
+        """
+        q = self._normalize(vector)
+        if q is None:
+            return None
+
+        with self._lock:
+            self._check_index_version()
+            if not self._entries or self._vectors is None or len(q) != self._vectors.shape[1]:
+                self.misses += 1
+                return None
+
+            now = time.time()
+            for slot in [s for s, e in self._entries.items() if e["expires_at"] <= now]:
+                self._remove(slot)
+
+            slots = np.fromiter(self._entries.keys(), dtype=np.int64)
+            if len(slots) == 0:
+                self.misses += 1
+                return None
+
+            similarities = self._vectors[slots] @ q
+            best = int(np.argmax(similarities))
+            if 1.0 - float(similarities[best]) > self.max_distance:
+                self.misses += 1
+                return None
+
+            slot = int(slots[best])
+            self._entries.move_to_end(slot)
+            self.hits += 1
+            entry = self._entries[slot]
+            return {
+                "query": entry["query"],
+                "answer": entry["answer"],
+                "sources": entry["sources"],
+            }
+
+    def put(self, vector, query: str, answer: str, sources: List[Dict] = None):
+        q = self._normalize(vector)
+        if q is None:
+            return
+
+        with self._lock:
+            self._check_index_version()
+            if self._vectors is None or self._vectors.shape[1] != len(q):
+                self._vectors = np.zeros((self.max_entries, len(q)), dtype=np.float32)
+                self._clear()
+
+            if not self._free_slots:
+                lru_slot = next(iter(self._entries))
+                self._remove(lru_slot)
+                self.evictions += 1
+
+            slot = self._free_slots.pop()
+            self._vectors[slot] = q
+            self._entries[slot] = {
+                "query": query,
+                "answer": answer,
+                "sources": sources or [],
+                "expires_at": time.time() + self.ttl_seconds,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+semantic_cache = SemanticCache(
+    max_entries=int(os.getenv("SEMANTIC_CACHE_SIZE", "1000")),
+    ttl_seconds=int(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+    max_distance=float(os.getenv("SEMANTIC_CACHE_MAX_DISTANCE", "0.08")),
+)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from typing import Dict
+
+_groups: Dict[str, "SingleFlight"] = {}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key: the first caller runs the
+    upstream call, every caller arriving while it is in flight waits for and
+    receives the same result (or exception). Nothing is cached afterwards.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0  # upstream calls actually made
+        self.collapsed = 0  # calls served by another in-flight call
+
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._futures: Dict[str, asyncio.Future] = {}
+        _groups[name] = self
+
+    def do(self, key: str, fn, *args):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self.calls += 1
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: str, fn, *args):
+        """
+        Async variant; `fn` is a coroutine function. Callers must share one
+        event loop (the API server's). The upstream call runs as its own
+        task that every caller awaits through a shield, so a cancelled
+        caller (e.g. a disconnected stream) never cancels it for the others.
+        """
+        task = self._futures.get(key)
+        if task is not None:
+            self.collapsed += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn(*args))
+        self._futures[key] = task
+        self.calls += 1
+
+        def finished(t):
+            if self._futures.get(key) is t:
+                del self._futures[key]
+            # Mark the outcome as retrieved even when nobody is waiting any more
+            t.cancelled() or t.exception()
+
+        task.add_done_callback(finished)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict:
+        total = self.calls + self.collapsed
+        return {
+            "upstream_calls": self.calls,
+            "collapsed_calls": self.collapsed,
+            "collapse_rate": self.collapsed / total if total else 0.0,
+        }
+
+
+def singleflight_stats() -> Dict:
+    return {name: group.stats() for name, group in _groups.items()}
@@ -0,0 +1,25 @@
+import os
+import shutil
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Local state shared by the API server and the ingestion scripts
+DATA_DIR = os.getenv(
+    "DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data"),
+)
+
+
+def replace_dir(source: str, target: str):
+    """
+    Move a fully written directory into place of `target`. The old
+    directory is renamed aside first, so readers see either the old or the
+    new one, never a partial one.
+    """
+    old_dir = f"{target}.old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(target):
+        os.rename(target, old_dir)
+    os.rename(source, target)
+    shutil.rmtree(old_dir, ignore_errors=True)
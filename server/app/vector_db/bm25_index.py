@@ -0,0 +1,170 @@
+import os
+import re
+import json
+import shutil
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+import numpy as np
+from app.utils.storage import DATA_DIR, replace_dir
+from app.scraping.metadata import matches_filters
+
+BM25_DIR = os.path.join(DATA_DIR, "bm25")
+K1 = 1.2
+B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+_COMPOUND_PATTERN = re.compile(r"[a-z0-9]+(?:[-_/.][a-z0-9]+)+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased alphanumeric tokens. Hyphenated identifiers such as
+    "INSAT-3DR" or "SCATSAT-1" also yield a joined token ("insat3dr").
+    """
+    text = text.lower()
+    tokens = _TOKEN_PATTERN.findall(text)
+    tokens.extend(re.sub(r"[-_/.]", "", m) for m in _COMPOUND_PATTERN.findall(text))
+    return tokens
+
+
+def build_bm25_index(chunks: List[Dict], index_dir: str = BM25_DIR):
+    """
+    Build an array-backed inverted index over chunks from
+    `preprocess.chunk_text` and write it to `index_dir`.
+    Postings are stored CSR-style: the postings of term t live in
+    postings_docs/postings_tfs[term_offsets[t]:term_offsets[t + 1]].
+    """
+    vocab: Dict[str, int] = {}
+    term_postings: List[List[tuple]] = []
+    doc_lengths = np.zeros(len(chunks), dtype=np.float32)
+
+    for doc_id, chunk in enumerate(chunks):
+        counts = Counter(tokenize(f"{chunk.get('title', '')} {chunk.get('content', '')}"))
+        doc_lengths[doc_id] = sum(counts.values())
+        for term, tf in counts.items():
+            term_id = vocab.setdefault(term, len(vocab))
+            if term_id == len(term_postings):
+                term_postings.append([])
+            term_postings[term_id].append((doc_id, tf))
+
+    term_offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    term_offsets[1:] = np.cumsum([len(p) for p in term_postings])
+    postings_docs = np.empty(term_offsets[-1], dtype=np.int32)
+    postings_tfs = np.empty(term_offsets[-1], dtype=np.float32)
+    for term_id, postings in enumerate(term_postings):
+        start, end = term_offsets[term_id], term_offsets[term_id + 1]
+        postings_docs[start:end] = [doc for doc, _ in postings]
+        postings_tfs[start:end] = [tf for _, tf in postings]
+
+    tmp_dir = f"{index_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "term_offsets.npy"), term_offsets)
+    np.save(os.path.join(tmp_dir, "postings_docs.npy"), postings_docs)
+    np.save(os.path.join(tmp_dir, "postings_tfs.npy"), postings_tfs)
+    np.save(os.path.join(tmp_dir, "doc_lengths.npy"), doc_lengths)
+    with open(os.path.join(tmp_dir, "vocab.json"), "w") as f:
+        json.dump(vocab, f)
+    with open(os.path.join(tmp_dir, "docs.jsonl"), "w") as f:
+        for chunk in chunks:
+            f.write(json.dumps(chunk) + "\n")
+
+    # Swap the finished index in place of the old one
+    replace_dir(tmp_dir, index_dir)
+
+    print(f"✅ Built BM25 index: {len(chunks)} chunks, {len(vocab)} terms")
+
+
+class BM25Index:
+    """
+    Read-only BM25 index; the postings arrays are memory-mapped.
+    """
+
+    def __init__(self, index_dir: str = BM25_DIR):
+        load = lambda name: np.load(os.path.join(index_dir, name), mmap_mode="r")
+        self.term_offsets = load("term_offsets.npy")
+        self.postings_docs = load("postings_docs.npy")
+        self.postings_tfs = load("postings_tfs.npy")
+        self.doc_lengths = np.asarray(load("doc_lengths.npy"))
+        with open(os.path.join(index_dir, "vocab.json")) as f:
+            self.vocab = json.load(f)
+        with open(os.path.join(index_dir, "docs.jsonl")) as f:
+            self.docs = [json.loads(line) for line in f]
+
+        self.num_docs = len(self.docs)
+        self.avg_length = float(self.doc_lengths.mean()) if self.num_docs else 0.0
+
+    def search(self, query: str, top_k: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
+        """
+        Score all documents containing any query term and return the top_k
+        payloads with `score` (BM25) and `matched_terms`, restricted to
+        documents matching `filters` (see metadata.matches_filters).
+        """
+        term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not term_ids or not self.num_docs:
+            return []
+
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        matched = np.zeros(self.num_docs, dtype=np.int32)
+        norm = K1 * (1 - B + B * self.doc_lengths / self.avg_length)
+
+        for term_id in term_ids:
+            start, end = self.term_offsets[term_id], self.term_offsets[term_id + 1]
+            docs = self.postings_docs[start:end]
+            tfs = self.postings_tfs[start:end]
+            df = end - start
+            idf = np.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            scores[docs] += idf * tfs * (K1 + 1) / (tfs + norm[docs])
+            matched[docs] += 1
+
+        candidates = np.flatnonzero(scores)
+        if filters:
+            candidates = np.array(
+                [d for d in candidates if matches_filters(self.docs[d], filters)], dtype=np.int64
+            )
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        return [
+            {
+                **self.docs[doc_id],
+                "score": float(scores[doc_id]),
+                "matched_terms": int(matched[doc_id]),
+            }
+            for doc_id in candidates
+        ]
+
+
+_index: Optional[BM25Index] = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+
+def get_bm25_index() -> Optional[BM25Index]:
+    """
+    Return the BM25 index, (re)loading it when ingestion rebuilt it.
+    None when no index has been built yet.
+    """
+    global _index, _index_mtime
+    try:
+        mtime = os.stat(os.path.join(BM25_DIR, "docs.jsonl")).st_mtime_ns
+    except OSError:
+        return None
+
+    if mtime != _index_mtime:
+        with _index_lock:
+            if mtime != _index_mtime:
+                try:
+                    _index = BM25Index(BM25_DIR)
+                    _index_mtime = mtime
+                except Exception as e:
+                    print(f"BM25 index load failed: {e}")
+                    return _index
+    return _index
+
+
+def lexical_search(query: str, top_k: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
+    index = get_bm25_index()
+    return index.search(query, top_k, filters) if index else []
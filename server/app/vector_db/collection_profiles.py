@@ -0,0 +1,139 @@
+import os
+from typing import Dict
+from dotenv import load_dotenv
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    HnswConfigDiff,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+load_dotenv()
+
+# Storage/index layouts for the chunk collection. Quantized profiles keep the
+# compressed vectors in RAM for HNSW traversal and rescore the oversampled
+# candidates with the original vectors, which live on disk.
+COLLECTION_PROFILES: Dict[str, Dict] = {
+    # Baseline: float32 vectors and payload in RAM
+    "float32": {
+        "quantization": None,
+        "on_disk_vectors": False,
+        "on_disk_payload": False,
+        "m": 16,
+        "ef_construct": 100,
+        "hnsw_ef": 128,
+        "oversampling": 1.0,
+    },
+    # int8 scalar quantization: ~4x less vector RAM, near-identical recall
+    "scalar": {
+        "quantization": "scalar",
+        "on_disk_vectors": True,
+        "on_disk_payload": True,
+        "m": 16,
+        "ef_construct": 100,
+        "hnsw_ef": 128,
+        "oversampling": 1.5,
+    },
+    # 1-bit binary quantization: ~32x less vector RAM, needs more rescoring
+    "binary": {
+        "quantization": "binary",
+        "on_disk_vectors": True,
+        "on_disk_payload": True,
+        "m": 16,
+        "ef_construct": 100,
+        "hnsw_ef": 128,
+        "oversampling": 3.0,
+    },
+    # No quantization, everything on disk (smallest RAM, slowest cold reads)
+    "on_disk": {
+        "quantization": None,
+        "on_disk_vectors": True,
+        "on_disk_payload": True,
+        "m": 16,
+        "ef_construct": 100,
+        "hnsw_ef": 128,
+        "oversampling": 1.0,
+    },
+}
+
+COLLECTION_PROFILE = os.getenv("COLLECTION_PROFILE", "float32")
+
+
+def get_profile(name: str = COLLECTION_PROFILE) -> Dict:
+    """
+    Profile settings, with HNSW_M / HNSW_EF_CONSTRUCT / HNSW_EF /
+    QUANTIZATION_OVERSAMPLING environment overrides applied.
+    """
+    if name not in COLLECTION_PROFILES:
+        raise ValueError(
+            f"Unknown collection profile {name!r}; choose from {', '.join(COLLECTION_PROFILES)}"
+        )
+    profile = dict(COLLECTION_PROFILES[name], name=name)
+    for key, env, cast in (
+        ("m", "HNSW_M", int),
+        ("ef_construct", "HNSW_EF_CONSTRUCT", int),
+        ("hnsw_ef", "HNSW_EF", int),
+        ("oversampling", "QUANTIZATION_OVERSAMPLING", float),
+    ):
+        if os.getenv(env):
+            profile[key] = cast(os.getenv(env))
+    return profile
+
+
+def collection_config(vector_size: int, profile: Dict) -> Dict:
+    """
+    Keyword arguments for `create_collection` under `profile`.
+    """
+    quantization = None
+    if profile["quantization"] == "scalar":
+        quantization = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    elif profile["quantization"] == "binary":
+        quantization = BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+
+    return {
+        "vectors_config": VectorParams(
+            size=vector_size, distance=Distance.COSINE, on_disk=profile["on_disk_vectors"]
+        ),
+        "hnsw_config": HnswConfigDiff(m=profile["m"], ef_construct=profile["ef_construct"]),
+        "quantization_config": quantization,
+        "on_disk_payload": profile["on_disk_payload"],
+    }
+
+
+def search_params(profile: Dict, exact: bool = False) -> SearchParams:
+    return SearchParams(
+        hnsw_ef=profile["hnsw_ef"],
+        exact=exact,
+        quantization=(
+            QuantizationSearchParams(rescore=True, oversampling=profile["oversampling"])
+            if profile["quantization"]
+            else None
+        ),
+    )
+
+
+def estimate_memory(profile: Dict, num_vectors: int, vector_size: int, payload_bytes: int = 0) -> Dict:
+    """
+    Rough RAM/disk footprint in bytes of a collection under `profile`.
+    """
+    full = num_vectors * vector_size * 4
+    quantized = {
+        "scalar": num_vectors * vector_size,
+        "binary": num_vectors * ((vector_size + 7) // 8),
+    }.get(profile["quantization"], 0)
+    # HNSW links: up to 2*m neighbours on layer 0, 4-byte point ids
+    graph = num_vectors * profile["m"] * 2 * 4
+
+    ram = graph + quantized
+    disk = full + quantized + graph + payload_bytes
+    ram += 0 if profile["on_disk_vectors"] else full
+    ram += 0 if profile["on_disk_payload"] else payload_bytes
+    return {"ram_bytes": ram, "disk_bytes": disk}
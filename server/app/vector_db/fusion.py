@@ -0,0 +1,28 @@
+from typing import Dict, List
+from app.utils.urls import canonicalize_url
+
+
+def hit_key(hit: Dict):
+    """
+    Identity of a retrieved chunk across different result lists.
+    """
+    return (canonicalize_url(hit.get("url", "")), hit.get("chunk_id"))
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict]], k: int = 60, top_k: int = None) -> List[Dict]:
+    """
+    Merge several ranked hit lists with Reciprocal Rank Fusion.
+    Each hit scores sum(1 / (k + rank)) over the lists it appears in; the
+    payload of its first occurrence is kept and its `score` is replaced by
+    the fused one, since cosine and BM25 scores are not comparable.
+    """
+    fused = {}
+    for hits in result_lists:
+        for rank, hit in enumerate(hits, 1):
+            key = hit_key(hit)
+            if key not in fused:
+                fused[key] = {**hit, "score": 0.0}
+            fused[key]["score"] += 1.0 / (k + rank)
+
+    merged = sorted(fused.values(), key=lambda h: h["score"], reverse=True)
+    return merged[:top_k] if top_k else merged
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import shutil
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from app.utils.storage import DATA_DIR, replace_dir
+from app.scraping.metadata import matches_filters
+
+LOCAL_INDEX_DIR = os.path.join(DATA_DIR, "local_index")
+
+
+def _write_index(index_dir: str, count: int, dimension: int, model: str, fill):
+    """
+    Write an index directory atomically. `fill(vectors, payload_file)`
+    writes `count` rows into the (memory-mapped) vector matrix and one JSON
+    payload per line.
+    """
+    tmp_dir = f"{index_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    vectors = np.lib.format.open_memmap(
+        os.path.join(tmp_dir, "vectors.npy"), mode="w+", dtype=np.float32, shape=(max(count, 1), dimension)
+    )
+    with open(os.path.join(tmp_dir, "payloads.jsonl"), "w") as f:
+        written = fill(vectors, f)
+    vectors.flush()
+    del vectors
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(
+            {"model": model, "dimension": dimension, "count": written, "created_at": time.time()}, f
+        )
+
+    replace_dir(tmp_dir, index_dir)
+    print(f"✅ Wrote local vector index: {written} vectors x {dimension} dims")
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def build_local_index(payloads: List[Dict], embeddings, model: str, index_dir: str = LOCAL_INDEX_DIR):
+    """
+    Build the local index from chunk payloads and their embeddings.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+
+    def fill(vectors, payload_file):
+        for start in range(0, len(payloads), 4096):
+            vectors[start : start + 4096] = _unit_rows(embeddings[start : start + 4096])
+        for payload in payloads:
+            payload_file.write(json.dumps(payload) + "\n")
+        return len(payloads)
+
+    _write_index(index_dir, len(payloads), embeddings.shape[1], model, fill)
+
+
+def export_snapshot(client, collection_name: str, model: str, index_dir: str = LOCAL_INDEX_DIR, batch_size: int = 512):
+    """
+    Dump every vector and payload of a Qdrant collection into a local index.
+    """
+    count = client.count(collection_name, exact=True).count
+    dimension = client.get_collection(collection_name).config.params.vectors.size
+
+    def fill(vectors, payload_file):
+        row, offset = 0, None
+        while row < count:
+            points, offset = client.scroll(
+                collection_name=collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            points = points[: count - row]  # ignore points added during export
+            if points:
+                vectors[row : row + len(points)] = _unit_rows([p.vector for p in points])
+                for point in points:
+                    payload_file.write(json.dumps(point.payload) + "\n")
+                row += len(points)
+            if offset is None:
+                break
+        return row
+
+    _write_index(index_dir, count, dimension, model, fill)
+
+
+class LocalVectorIndex:
+    """
+    In-process exact cosine search over a memory-mapped matrix of unit
+    vectors (brute force: one matrix-vector product per query).
+    """
+
+    def __init__(self, index_dir: str = LOCAL_INDEX_DIR):
+        with open(os.path.join(index_dir, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.vectors = np.load(os.path.join(index_dir, "vectors.npy"), mmap_mode="r")[
+            : self.meta["count"]
+        ]
+        with open(os.path.join(index_dir, "payloads.jsonl")) as f:
+            self.payloads = [json.loads(line) for line in f]
+
+    def _mask(self, filters: Optional[Dict]) -> Optional[np.ndarray]:
+        if not filters:
+            return None
+        return np.fromiter(
+            (matches_filters(p, filters) for p in self.payloads), dtype=bool, count=len(self.payloads)
+        )
+
+    def search_batch(self, query_vectors, top_k: int = 5, filters: Optional[Dict] = None) -> List[List[Dict]]:
+        if not len(self.payloads):
+            return [[] for _ in query_vectors]
+        scores = _unit_rows(query_vectors) @ self.vectors.T  # (queries, points)
+        mask = self._mask(filters)
+        if mask is not None:
+            scores[:, ~mask] = -np.inf
+
+        k = min(top_k, scores.shape[1])
+        results = []
+        for row in scores:
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.argsort(-row[top])]
+            results.append(
+                [{**self.payloads[i], "score": float(row[i])} for i in top if row[i] > -np.inf]
+            )
+        return results
+
+    def search(self, query_vector, top_k: int = 5, filters: Optional[Dict] = None) -> List[Dict]:
+        return self.search_batch([query_vector], top_k, filters)[0]
+
+
+_index: Optional[LocalVectorIndex] = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+
+def get_local_index(model: Optional[str] = None) -> Optional[LocalVectorIndex]:
+    """
+    Return the local vector index, reloading it when it was rewritten.
+    None when there is none, or when it was built with another embedding
+    model than `model`.
+    """
+    global _index, _index_mtime
+    try:
+        mtime = os.stat(os.path.join(LOCAL_INDEX_DIR, "meta.json")).st_mtime_ns
+    except OSError:
+        return None
+
+    if mtime != _index_mtime:
+        with _index_lock:
+            if mtime != _index_mtime:
+                try:
+                    _index = LocalVectorIndex(LOCAL_INDEX_DIR)
+                    _index_mtime = mtime
+                except Exception as e:
+                    print(f"Local vector index load failed: {e}")
+                    return _index
+
+    if _index is not None and model and _index.meta["model"] != model:
+        print(f"Local vector index was built with {_index.meta['model']}, not {model}; ignoring it")
+        return None
+    return _index
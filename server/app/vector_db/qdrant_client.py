@@ -1,9 +1,43 @@
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
-from qdrant_client.models import VectorParams, Distance, PointStruct
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import (
+    VectorParams,
+    Distance,
+    PointStruct,
+    SearchRequest,
+    Filter,
+    FieldCondition,
+    MatchAny,
+    MatchValue,
+    HasIdCondition,
+    PayloadSchemaType,
+    PointIdsList,
+    CreateAliasOperation,
+    CreateAlias,
+    DeleteAliasOperation,
+    DeleteAlias,
+)
+from concurrent.futures import ThreadPoolExecutor
+from tenacity import retry, stop_after_attempt, wait_exponential
+import re
 import uuid
+import json
+import hashlib
 import os
-from app.services.embeddings import embed_texts
+import time
+from app.services.embeddings import embed_texts, embed_texts_async, embedding_provider
+from app.utils.storage import DATA_DIR
+from app.utils.urls import canonicalize_url
+from app.scraping.metadata import FILTER_FIELDS
+from app.vector_db.bm25_index import lexical_search, tokenize
+from app.vector_db.fusion import reciprocal_rank_fusion
+from app.vector_db.local_index import get_local_index
+from app.vector_db.collection_profiles import (
+    COLLECTION_PROFILE,
+    collection_config,
+    get_profile,
+    search_params,
+)
 
 load_dotenv()
 
@@ -12,80 +46,758 @@ qdrant = QdrantClient(
     api_key=os.getenv("QDRANT_API_KEY"),  # optional, if running locally
     timeout=60.0,
 )
+async_qdrant = AsyncQdrantClient(
+    url=os.getenv("QDRANT_URL", "http://localhost:6333"),
+    api_key=os.getenv("QDRANT_API_KEY"),
+    timeout=60.0,
+)
 
+# Bulk loads (ingestion) go over gRPC; the HTTP client above serves queries
+bulk_qdrant = QdrantClient(
+    url=os.getenv("QDRANT_URL", "http://localhost:6333"),
+    api_key=os.getenv("QDRANT_API_KEY"),
+    prefer_grpc=os.getenv("QDRANT_PREFER_GRPC", "true").lower() == "true",
+    grpc_port=int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+    timeout=60.0,
+)
+# Points per request are capped by count and by approximate request bytes
+UPSERT_BATCH_BYTES = int(os.getenv("UPSERT_BATCH_BYTES", str(8 * 1024 * 1024)))
+UPSERT_CONCURRENCY = int(os.getenv("UPSERT_CONCURRENCY", "4"))
+
+# Alias that queries read through; it points at the live mosdac_chunks_v<N>
 COLLECTION_NAME = "mosdac_chunks"
+# Records which embedding provider/model produced each collection's vectors
+META_COLLECTION_NAME = f"{COLLECTION_NAME}_meta"
+
+# Blue/green re-indexing: versions kept after a swap (live + rollback targets)
+KEEP_COLLECTION_VERSIONS = int(os.getenv("KEEP_COLLECTION_VERSIONS", "2"))
+# Readiness gate before a new version goes live
+READINESS_MIN_POINT_RATIO = float(os.getenv("READINESS_MIN_POINT_RATIO", "0.98"))
+READINESS_MIN_RECALL = float(os.getenv("READINESS_MIN_RECALL", "0.9"))
+
+# Storage layout and search-time HNSW ef / rescoring (see collection_profiles)
+SEARCH_PARAMS = search_params(get_profile(COLLECTION_PROFILE))
+
+# "qdrant", or "local" to search the in-process index (scripts/export_local_index.py)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant")
+# Search the local index when Qdrant is unreachable
+LOCAL_INDEX_FALLBACK = os.getenv("LOCAL_INDEX_FALLBACK", "true").lower() == "true"
+
+# Fuse vector hits with the local BM25 index (also the fallback when Qdrant is down)
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "true").lower() == "true"
+LEXICAL_SHORTCUT_MAX_TERMS = 3
+
+# Touched after every re-index so in-process caches can detect stale answers
+INDEX_VERSION_PATH = os.path.join(DATA_DIR, f"{COLLECTION_NAME}.version")
+
+
+def mark_index_updated():
+    """
+    Record that the collection content changed.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(INDEX_VERSION_PATH, "w") as f:
+        f.write(str(time.time()))
+
+
+def get_index_version():
+    """
+    Return an opaque marker that changes whenever the index is rebuilt.
+    """
+    try:
+        return os.stat(INDEX_VERSION_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+
+def resolve_collection(name: str = COLLECTION_NAME) -> str:
+    """
+    Name of the collection behind an alias (or `name` itself).
+    """
+    for alias in qdrant.get_aliases().aliases:
+        if alias.alias_name == name:
+            return alias.collection_name
+    return name
+
+
+def versioned_name(version: int) -> str:
+    return f"{COLLECTION_NAME}_v{version}"
+
+
+def list_versions():
+    """
+    Versions of mosdac_chunks_v<N> that exist, oldest first.
+    """
+    pattern = re.compile(rf"^{re.escape(COLLECTION_NAME)}_v(\d+)$")
+    return sorted(
+        int(m.group(1))
+        for c in qdrant.get_collections().collections
+        if (m := pattern.match(c.name))
+    )
+
+
+def create_next_version(vector_size: int, profile: str = COLLECTION_PROFILE) -> str:
+    """
+    Create an empty mosdac_chunks_v<N+1> next to the live collection.
+    """
+    versions = list_versions()
+    name = versioned_name((versions[-1] if versions else 0) + 1)
+    init_collection(vector_size, profile, name)
+    return name
+
+
+def wait_until_indexed(collection_name: str, timeout: float = 600.0):
+    """
+    Wait for the optimizers to finish (collection status green).
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if str(qdrant.get_collection(collection_name).status).lower().endswith("green"):
+            return
+        time.sleep(1.0)
+    print(f"⚠️ {collection_name} still optimizing after {timeout:.0f}s")
+
+
+def check_ready(collection_name: str, expected_points: int, samples, top_k: int = 5):
+    """
+    Readiness of a freshly built version before it goes live: indexing is
+    finished, it holds at least READINESS_MIN_POINT_RATIO of the expected
+    points, and each sampled (point_id, vector) finds itself in the top_k
+    for at least READINESS_MIN_RECALL of the samples.
+    Returns (ready, report).
+    """
+    wait_until_indexed(collection_name)
+    info = qdrant.get_collection(collection_name)
+    points = qdrant.count(collection_name, exact=True).count
+    found = 0
+    for point_id, vector in samples:
+        hits = qdrant.search(
+            collection_name=collection_name,
+            query_vector=vector,
+            limit=top_k,
+            search_params=SEARCH_PARAMS,
+        )
+        found += any(str(hit.id) == str(point_id) for hit in hits)
+    recall = found / len(samples) if samples else 1.0
+
+    report = {
+        "collection": collection_name,
+        "status": str(info.status),
+        "points": points,
+        "expected_points": expected_points,
+        "sample_recall": recall,
+    }
+    ready = (
+        str(info.status).lower().endswith("green")
+        and points >= expected_points * READINESS_MIN_POINT_RATIO
+        and recall >= READINESS_MIN_RECALL
+    )
+    return ready, report
+
+
+def _preserve_unversioned():
+    """
+    Copy the pre-alias unversioned collection (and its recorded embedding
+    provider) into mosdac_chunks_v0. Raises if the copy is incomplete, in
+    which case the unversioned collection is left untouched.
+    """
+    backup = versioned_name(0)
+    if qdrant.collection_exists(backup):
+        qdrant.delete_collection(backup)  # left over from an interrupted migration
+    qdrant.create_collection(
+        collection_name=backup,
+        vectors_config=qdrant.get_collection(COLLECTION_NAME).config.params.vectors,
+    )
+    copied = copy_collection(COLLECTION_NAME, backup)
+    expected = qdrant.count(COLLECTION_NAME, exact=True).count
+    if qdrant.count(backup, exact=True).count < expected:
+        raise RuntimeError(f"copied {copied}/{expected} points of {COLLECTION_NAME} into {backup}")
+
+    info = get_embedding_info(COLLECTION_NAME)
+    if info:
+        qdrant.upsert(
+            collection_name=META_COLLECTION_NAME,
+            points=[
+                PointStruct(
+                    id=_meta_point_id(backup), vector=[1.0], payload={**info, "collection": backup}
+                )
+            ],
+        )
+    print(f"💾 Kept {COLLECTION_NAME} as {backup} ({copied} points)")
 
 
-def init_collection(vector_size: int):
+def swap_alias(collection_name: str):
     """
-    Create collection if not exists
+    Point the COLLECTION_NAME alias at `collection_name` in one atomic
+    alias update; readers switch over without seeing a partial index.
+    """
+    if COLLECTION_NAME in {c.name for c in qdrant.get_collections().collections}:
+        # One-time migration from the unversioned collection: the alias
+        # name is taken until that collection is dropped, so its data is
+        # kept as version 0 (a rollback target) first. Searches fall back
+        # to the local/BM25 indexes between the drop and the alias update.
+        _preserve_unversioned()
+        print(f"⚠️ Dropping unversioned collection {COLLECTION_NAME} to create the alias")
+        qdrant.delete_collection(COLLECTION_NAME)
+
+    operations = [
+        CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=collection_name, alias_name=COLLECTION_NAME)
+        )
+    ]
+    if resolve_collection(COLLECTION_NAME) != COLLECTION_NAME:
+        operations.insert(
+            0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=COLLECTION_NAME))
+        )
+    qdrant.update_collection_aliases(change_aliases_operations=operations)
+    mark_index_updated()
+    print(f"🔀 {COLLECTION_NAME} now points at {collection_name}")
+
+
+def discard_version(collection_name: str):
+    """
+    Drop a version that never went live (failed load or readiness check) so
+    it cannot count as a rollback target; the live one is never dropped.
     """
     try:
-        if not qdrant.collection_exists(COLLECTION_NAME):
+        if collection_name == resolve_collection(COLLECTION_NAME):
+            return
+        qdrant.delete_collection(collection_name)
+        print(f"🗑️ Dropped unused collection {collection_name}")
+    except Exception as e:
+        print(f"⚠️ Could not drop {collection_name}: {e}")
+
+
+def cleanup_old_versions(keep: int = KEEP_COLLECTION_VERSIONS):
+    """
+    Drop all but the newest `keep` versions; the live one is never dropped.
+    """
+    live = resolve_collection(COLLECTION_NAME)
+    for version in list_versions()[:-keep] if keep > 0 else list_versions():
+        name = versioned_name(version)
+        if name != live:
+            qdrant.delete_collection(name)
+            print(f"🗑️ Dropped old collection {name}")
+
+
+def _meta_point_id(collection_name: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"qdrant-collection/{collection_name}"))
+
+
+def record_embedding_provider(collection_name: str = COLLECTION_NAME):
+    """
+    Store the provider, model and dimension of the collection's vectors.
+    """
+    if not qdrant.collection_exists(META_COLLECTION_NAME):
+        qdrant.create_collection(
+            collection_name=META_COLLECTION_NAME,
+            vectors_config=VectorParams(size=1, distance=Distance.DOT),
+        )
+    qdrant.upsert(
+        collection_name=META_COLLECTION_NAME,
+        points=[
+            PointStruct(
+                id=_meta_point_id(collection_name),
+                vector=[1.0],
+                payload={
+                    "collection": collection_name,
+                    "provider": embedding_provider.name,
+                    "model": embedding_provider.model,
+                    "dimension": embedding_provider.dimension,
+                    "updated_at": time.time(),
+                },
+            )
+        ],
+    )
+
+
+def get_embedding_info(collection_name: str = COLLECTION_NAME):
+    """
+    Return the recorded embedding provider info of a collection, or None.
+    """
+    if not qdrant.collection_exists(META_COLLECTION_NAME):
+        return None
+    points = qdrant.retrieve(
+        collection_name=META_COLLECTION_NAME,
+        ids=[_meta_point_id(resolve_collection(collection_name))],
+    )
+    return points[0].payload if points else None
+
+
+def check_embedding_provider(collection_name: str = COLLECTION_NAME):
+    """
+    Raise RuntimeError when the configured embedding provider does not
+    match the one the collection was built with. Missing collections and
+    an unreachable Qdrant are reported but not fatal.
+    """
+    try:
+        collection_name = resolve_collection(collection_name)
+        if not qdrant.collection_exists(collection_name):
+            return
+        vectors = qdrant.get_collection(collection_name).config.params.vectors
+        info = get_embedding_info(collection_name)
+    except Exception as e:
+        print(f"⚠️ Could not verify embedding provider of {collection_name}: {e}")
+        return
+
+    problems = []
+    size = getattr(vectors, "size", None)
+    if size is not None and size != embedding_provider.dimension:
+        problems.append(f"vector size {size} != provider dimension {embedding_provider.dimension}")
+    if info and info.get("model") != embedding_provider.model:
+        problems.append(
+            f"built with {info.get('provider')}/{info.get('model')}, "
+            f"configured {embedding_provider.name}/{embedding_provider.model}"
+        )
+    if problems:
+        raise RuntimeError(
+            f"Embedding provider mismatch for collection {collection_name}: "
+            + "; ".join(problems)
+            + ". Re-run scripts/run_scraper.py or change EMBEDDING_PROVIDER."
+        )
+
+
+def init_collection(vector_size: int, profile: str = COLLECTION_PROFILE, collection_name: str = COLLECTION_NAME):
+    """
+    Create collection if not exists, laid out according to the given
+    collection profile (quantization, on-disk storage, HNSW parameters).
+    """
+    try:
+        if not qdrant.collection_exists(collection_name):
             qdrant.create_collection(
-                collection_name=COLLECTION_NAME,
-                vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+                collection_name=collection_name,
+                **collection_config(vector_size, get_profile(profile)),
             )
-            print(f"✅ Created collection {COLLECTION_NAME}")
+            record_embedding_provider(collection_name)
+            print(f"✅ Created collection {collection_name} (profile: {profile})")
         else:
-            print(f"📁 Collection {COLLECTION_NAME} already exists")
+            check_embedding_provider(collection_name)
+            if get_embedding_info(collection_name) is None:
+                record_embedding_provider(collection_name)
+            print(f"📁 Collection {collection_name} already exists")
+        # url backs stale-point deletion, the metadata fields filtered search
+        for field in ("url",) + FILTER_FIELDS:
+            qdrant.create_payload_index(
+                collection_name=collection_name,
+                field_name=field,
+                field_schema=PayloadSchemaType.KEYWORD,
+            )
     except Exception as e:
         print(f"❌ Collection initialization error: {e}")
         raise
 
 
-def upsert_chunks(chunks, embeddings, batch_size=100):
+def chunk_point_id(url: str, chunk_id: int, content: str) -> str:
     """
-    Store chunks with embeddings in Qdrant in batches.
+    Deterministic point id of a chunk: re-ingesting unchanged content
+    overwrites the same point instead of adding a duplicate.
     """
-    total = len(chunks)
-    for i in range(0, total, batch_size):
-        batch_chunks = chunks[i : i + batch_size]
-        batch_embeddings = embeddings[i : i + batch_size]
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{canonicalize_url(url)}#{chunk_id}#{content_hash}"))
 
-        points = [
-            PointStruct(
-                id=str(uuid.uuid4()),
-                vector=embedding,
-                payload={
-                    "url": chunk.get("url", ""),
-                    "title": chunk.get("title", ""),
-                    "content": chunk.get("content", ""),
-                    "chunk_id": chunk.get("chunk_id", j + i),
-                },
-            )
-            for j, (chunk, embedding) in enumerate(zip(batch_chunks, batch_embeddings))
-        ]
 
-        try:
+def chunk_payload(chunk, position: int = 0):
+    """
+    Stored payload of a chunk from `preprocess.chunk_text`.
+    """
+    return {
+        "url": canonicalize_url(chunk.get("url", "")),
+        "title": chunk.get("title", ""),
+        "content": chunk.get("content", ""),
+        "chunk_id": chunk.get("chunk_id", position),
+        **{field: chunk[field] for field in FILTER_FIELDS if field in chunk},
+    }
+
+
+def delete_stale_points(point_ids_by_url, prune_other_urls: bool = False, collection_name: str = COLLECTION_NAME):
+    """
+    Delete points of the given URLs that are not in their current id set
+    (chunks that changed or disappeared). With `prune_other_urls`, points
+    of URLs absent from `point_ids_by_url` are deleted too.
+    """
+    for url, point_ids in point_ids_by_url.items():
+        qdrant.delete(
+            collection_name=collection_name,
+            points_selector=Filter(
+                must=[FieldCondition(key="url", match=MatchValue(value=url))],
+                must_not=[HasIdCondition(has_id=list(point_ids))],
+            ),
+            wait=True,
+        )
+    if prune_other_urls and point_ids_by_url:
+        qdrant.delete(
+            collection_name=collection_name,
+            points_selector=Filter(
+                must_not=[FieldCondition(key="url", match=MatchAny(any=list(point_ids_by_url)))]
+            ),
+            wait=True,
+        )
+
+
+def _point_bytes(point: PointStruct) -> int:
+    return 4 * len(point.vector) + len(json.dumps(point.payload))
+
+
+def _byte_batches(points, max_points: int, max_bytes: int):
+    batch, batch_bytes = [], 0
+    for point in points:
+        size = _point_bytes(point)
+        if batch and (len(batch) >= max_points or batch_bytes + size > max_bytes):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(point)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+@retry(stop=stop_after_attempt(4), wait=wait_exponential(multiplier=1, min=1, max=20), reraise=True)
+def _send_batch(collection_name, points):
+    # wait=False: Qdrant acknowledges once the batch is in its WAL
+    bulk_qdrant.upsert(collection_name=collection_name, points=points, wait=False)
+
+
+def _consistency_barrier(collection_name):
+    """
+    Block until every previously acknowledged update is applied: updates
+    are applied in order, so a waited no-op (deleting an id that does not
+    exist) completes only after them.
+    """
+    bulk_qdrant.delete(
+        collection_name=collection_name,
+        points_selector=PointIdsList(points=[str(uuid.UUID(int=0))]),
+        wait=True,
+    )
+
+
+def upsert_chunks(chunks, embeddings, batch_size=256, prune_other_urls=False, collection_name=COLLECTION_NAME):
+    """
+    Store chunks with embeddings in Qdrant.
+    Batches (at most `batch_size` points / UPSERT_BATCH_BYTES) are sent
+    concurrently over gRPC without waiting, each retried on failure, then
+    a consistency barrier waits for all of them to be applied.
+    Upserts are idempotent (deterministic ids); afterwards the points of
+    each ingested URL that no longer match a current chunk are deleted.
+    Pass `prune_other_urls=True` when `chunks` is the whole corpus, and
+    `collection_name` to load a new version instead of the live alias.
+    Returns {"upserted", "failed", "failed_urls"}.
+    """
+    point_ids_by_url = {}
+    points = []
+    for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+        payload = chunk_payload(chunk, i)
+        point_id = chunk_point_id(payload["url"], payload["chunk_id"], payload["content"])
+        point_ids_by_url.setdefault(payload["url"], set()).add(point_id)
+        points.append(PointStruct(id=point_id, vector=embedding, payload=payload))
+
+    batches = list(_byte_batches(points, batch_size, UPSERT_BATCH_BYTES))
+    failed_urls, upserted, failed = set(), 0, 0
+    with ThreadPoolExecutor(max_workers=UPSERT_CONCURRENCY) as executor:
+        futures = [executor.submit(_send_batch, collection_name, batch) for batch in batches]
+        for n, (future, batch) in enumerate(zip(futures, batches), 1):
+            try:
+                future.result()
+                upserted += len(batch)
+                print(f"✅ Upserted {len(batch)} chunks (batch {n}/{len(batches)})")
+            except Exception as e:
+                failed += len(batch)
+                failed_urls.update(point.payload["url"] for point in batch)
+                print(f"❌ Failed to insert batch {n}/{len(batches)} after retries: {e}")
+
+    _consistency_barrier(collection_name)
+
+    # Keep the old points of URLs whose new chunks did not all arrive
+    delete_stale_points(
+        {url: ids for url, ids in point_ids_by_url.items() if url not in failed_urls},
+        prune_other_urls and not failed_urls,
+        collection_name,
+    )
+    if collection_name == COLLECTION_NAME:
+        mark_index_updated()
+    return {"upserted": upserted, "failed": failed, "failed_urls": sorted(failed_urls)}
+
+
+def copy_collection(source: str, target: str, batch_size: int = 256, on_batch=None) -> int:
+    """
+    Copy every point (ids, vectors, payloads) from `source` into the
+    existing collection `target`. `on_batch(points)` sees each scrolled
+    batch. Returns the number of points copied.
+    """
+    copied, offset = 0, None
+    while True:
+        points, offset = qdrant.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if points:
             qdrant.upsert(
-                collection_name=COLLECTION_NAME,
-                points=points,
+                collection_name=target,
+                points=[
+                    PointStruct(id=p.id, vector=p.vector, payload=p.payload) for p in points
+                ],
                 wait=True,
             )
-            print(f"✅ Inserted {len(points)} chunks (batch {i//batch_size + 1})")
-        except Exception as e:
-            print(f"❌ Failed to insert batch {i//batch_size + 1}: {e}")
-            raise
+            copied += len(points)
+            if on_batch:
+                on_batch(points)
+        if offset is None:
+            return copied
 
 
-def search_chunks(query: str, top_k=5):
+def load_indexed_chunks(urls, batch_size: int = 256):
     """
-    Search Qdrant for most relevant chunks based on query.
-    Returns list of payloads (url, title, content).
+    Stored chunks (payloads) and vectors of the given pages from the live
+    index, so unchanged pages can be carried into a rebuild without being
+    scraped or embedded again. Returns ([], []) when the live index was
+    built with another embedding model.
     """
-    try:
-        query_embedding = embed_texts([query])[0]
+    wanted = {canonicalize_url(u) for u in urls}
+    if not wanted:
+        return [], []
+
+    if VECTOR_BACKEND == "local":
+        index = get_local_index(embedding_provider.model)
+        if index is None:
+            return [], []
+        rows = [i for i, payload in enumerate(index.payloads) if payload.get("url") in wanted]
+        return [index.payloads[i] for i in rows], [index.vectors[i].tolist() for i in rows]
+
+    if not qdrant.collection_exists(COLLECTION_NAME):
+        return [], []
+    info = get_embedding_info(COLLECTION_NAME)
+    if info and info.get("model") != embedding_provider.model:
+        print(f"⚠️ {COLLECTION_NAME} was built with {info.get('model')}; not reusing its vectors")
+        return [], []
 
+    chunks, vectors = [], []
+    wanted = sorted(wanted)
+    for start in range(0, len(wanted), 500):
+        url_filter = Filter(
+            must=[FieldCondition(key="url", match=MatchAny(any=wanted[start : start + 500]))]
+        )
+        offset = None
+        while True:
+            points, offset = qdrant.scroll(
+                collection_name=COLLECTION_NAME,
+                scroll_filter=url_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            chunks.extend(point.payload for point in points)
+            vectors.extend(point.vector for point in points)
+            if offset is None:
+                break
+    return chunks, vectors
+
+
+def build_filter(filters) -> Filter:
+    """
+    Qdrant filter from {field: value or [values]}: every field must match
+    one of its values. Fields must be in FILTER_FIELDS.
+    """
+    if not filters:
+        return None
+    conditions = []
+    for field, values in filters.items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"Unsupported filter field: {field}")
+        values = values if isinstance(values, list) else [values]
+        conditions.append(FieldCondition(key=field, match=MatchAny(any=values)))
+    return Filter(must=conditions)
+
+
+def _local_index():
+    index = get_local_index(embedding_provider.model)
+    if index is None:
+        raise RuntimeError("no local vector index for the current embedding model")
+    return index
+
+
+def _vector_search(query_embedding, top_k, filters):
+    """
+    Vector hits from the configured backend; with LOCAL_INDEX_FALLBACK a
+    failed Qdrant search is answered from the local index.
+    """
+    if VECTOR_BACKEND == "local":
+        return _local_index().search(query_embedding, top_k, filters)
+    try:
         results = qdrant.search(
             collection_name=COLLECTION_NAME,
             query_vector=query_embedding,
+            query_filter=build_filter(filters),
             limit=top_k,
+            search_params=SEARCH_PARAMS,
         )
+        return [{**hit.payload, "score": hit.score} for hit in results]
+    except Exception as e:
+        if not LOCAL_INDEX_FALLBACK or get_local_index(embedding_provider.model) is None:
+            raise
+        print(f"Qdrant search failed ({e}), using local vector index")
+        return _local_index().search(query_embedding, top_k, filters)
+
+
+async def _vector_search_async(query_embedding, top_k, filters):
+    if VECTOR_BACKEND == "local":
+        return _local_index().search(query_embedding, top_k, filters)
+    try:
+        results = await async_qdrant.search(
+            collection_name=COLLECTION_NAME,
+            query_vector=query_embedding,
+            query_filter=build_filter(filters),
+            limit=top_k,
+            search_params=SEARCH_PARAMS,
+        )
+        return [{**hit.payload, "score": hit.score} for hit in results]
+    except Exception as e:
+        if not LOCAL_INDEX_FALLBACK or get_local_index(embedding_provider.model) is None:
+            raise
+        print(f"Qdrant search failed ({e}), using local vector index")
+        return _local_index().search(query_embedding, top_k, filters)
+
+
+def _local_hits(query_embedding, top_k, filters):
+    hits = _local_index().search(query_embedding, top_k, filters)
+    if filters and not hits:
+        hits = _local_index().search(query_embedding, top_k)
+    return hits
+
+
+def _lexical_shortcut(query: str, lexical_hits) -> bool:
+    """
+    Short keyword queries whose best BM25 hit contains every query term are
+    answered lexically, without an embedding round-trip.
+    """
+    terms = set(tokenize(query))
+    return (
+        bool(lexical_hits)
+        and len(terms) <= LEXICAL_SHORTCUT_MAX_TERMS
+        and lexical_hits[0]["matched_terms"] >= len(terms)
+    )
+
+
+def _hybrid(vector_hits, lexical_hits, top_k):
+    if not lexical_hits:
+        return vector_hits
+    if not vector_hits:
+        return lexical_hits[:top_k]
+    return reciprocal_rank_fusion([vector_hits, lexical_hits], top_k=top_k)
+
+
+def search_chunks(query: str, top_k=5, query_vector=None, lexical_query=None, filters=None):
+    """
+    Search Qdrant for most relevant chunks based on query.
+    Pass `query_vector` to reuse an embedding that was already computed and
+    `lexical_query` when the BM25 side should use different text (HyDE).
+    `filters` ({field: value(s)} over FILTER_FIELDS) restricts both sides;
+    if nothing matches them the search is repeated unfiltered.
+    Vector hits are fused with BM25 hits; when Qdrant or the embedding API
+    fails the BM25 hits are returned on their own.
+    Returns list of payloads (url, title, content) with a ranking score
+    (cosine similarity, BM25, or the RRF score when both sides are fused).
+    """
+    lexical_query = lexical_query or query
+    lexical_hits = lexical_search(lexical_query, top_k, filters) if HYBRID_SEARCH else []
+    if query_vector is None and _lexical_shortcut(lexical_query, lexical_hits):
+        return lexical_hits
+
+    try:
+        query_embedding = query_vector or embed_texts([query])[0]
 
-        hits = [hit.payload for hit in results]
-        return hits
+        hits = _vector_search(query_embedding, top_k, filters)
+        if filters and not hits and not lexical_hits:
+            return search_chunks(query, top_k, query_embedding, lexical_query)
+        return _hybrid(hits, lexical_hits, top_k)
 
     except Exception as e:
         print(f"Qdrant search failed: {e}")
-        return []
+        if lexical_hits:
+            print("Falling back to BM25 lexical hits")
+        return lexical_hits
+
+
+async def search_chunks_async(query: str, top_k=5, query_vector=None, lexical_query=None, filters=None):
+    """
+    Async variant of search_chunks using the async OpenAI and Qdrant clients.
+    """
+    lexical_query = lexical_query or query
+    lexical_hits = lexical_search(lexical_query, top_k, filters) if HYBRID_SEARCH else []
+    if query_vector is None and _lexical_shortcut(lexical_query, lexical_hits):
+        return lexical_hits
+
+    try:
+        query_embedding = query_vector or (await embed_texts_async([query]))[0]
+
+        hits = await _vector_search_async(query_embedding, top_k, filters)
+        if filters and not hits and not lexical_hits:
+            return await search_chunks_async(query, top_k, query_embedding, lexical_query)
+        return _hybrid(hits, lexical_hits, top_k)
+
+    except Exception as e:
+        print(f"Qdrant search failed: {e}")
+        if lexical_hits:
+            print("Falling back to BM25 lexical hits")
+        return lexical_hits
+
+
+async def search_chunks_batch_async(query_vectors, top_k=5, filters_list=None, lexical_queries=None):
+    """
+    Run several searches in one Qdrant `search_batch` request, with an
+    optional filter per query (see search_chunks). With `lexical_queries`
+    each query's vector hits are fused with its BM25 hits, which are also
+    the fallback when the vector search fails.
+    Returns one hit list per query vector.
+    """
+    filters_list = filters_list or [None] * len(query_vectors)
+    hit_lists = await _vector_search_batch_async(query_vectors, top_k, filters_list)
+    if not HYBRID_SEARCH or not lexical_queries:
+        return hit_lists
+    return [
+        _hybrid(hits, lexical_search(query, top_k, filters), top_k)
+        for hits, query, filters in zip(hit_lists, lexical_queries, filters_list)
+    ]
+
+
+async def _vector_search_batch_async(query_vectors, top_k, filters_list):
+    """
+    Vector side of search_chunks_batch_async (empty lists on failure).
+    """
+    filters_list = filters_list or [None] * len(query_vectors)
+    try:
+        if VECTOR_BACKEND == "local":
+            return [_local_hits(vector, top_k, filters) for vector, filters in zip(query_vectors, filters_list)]
+        results = await async_qdrant.search_batch(
+            collection_name=COLLECTION_NAME,
+            requests=[
+                SearchRequest(
+                    vector=vector,
+                    filter=build_filter(filters),
+                    limit=top_k,
+                    with_payload=True,
+                    params=SEARCH_PARAMS,
+                )
+                for vector, filters in zip(query_vectors, filters_list)
+            ],
+        )
+        hit_lists = [
+            [{**hit.payload, "score": hit.score} for hit in hits] for hits in results
+        ]
+        # Like search_chunks: repeat unfiltered when a filter matched nothing
+        retry = [i for i, hits in enumerate(hit_lists) if not hits and filters_list[i]]
+        if retry:
+            retried = await _vector_search_batch_async(
+                [query_vectors[i] for i in retry], top_k, None
+            )
+            for i, hits in zip(retry, retried):
+                hit_lists[i] = hits
+        return hit_lists
+
+    except Exception as e:
+        print(f"Vector batch search failed: {e}")
+        if VECTOR_BACKEND != "local" and LOCAL_INDEX_FALLBACK and get_local_index(embedding_provider.model) is not None:
+            return [_local_hits(vector, top_k, filters) for vector, filters in zip(query_vectors, filters_list)]
+        return [[] for _ in query_vectors]
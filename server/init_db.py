@@ -7,12 +7,16 @@ from app.db.base import Base
 # Import all models to register them with Base
 from app.models.user import User
 from app.models.chat_context import ChatContext
+from app.models.chat_summary import ChatSummary
 from app.models.download import DownloadJob
 
 def init_db():
     """Create all database tables"""
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     print("✓ Database tables created successfully!")
 
 if __name__ == "__main__":
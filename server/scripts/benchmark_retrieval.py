@@ -0,0 +1,366 @@
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import threading
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SERVER_DIR)
+
+DEFAULT_FIXTURE = os.path.join(SERVER_DIR, "benchmarks", "mosdac_sample.json")
+
+# Metrics compared by --compare: (section, metric, True if higher is better)
+COMPARED_METRICS = [
+    ("search", "recall_at_k", True),
+    ("search", "mrr", True),
+    ("search", "p50_ms", False),
+    ("search", "p95_ms", False),
+    ("search", "p99_ms", False),
+    ("search", "throughput_qps", True),
+    ("chat", "recall_at_k", True),
+    ("chat", "mrr", True),
+    ("chat", "p50_ms", False),
+    ("chat", "p95_ms", False),
+    ("chat", "p99_ms", False),
+    ("chat", "throughput_qps", True),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark retrieval quality and latency on a fixed corpus with local stand-ins "
+        "(in-memory Qdrant, local hash embeddings, stub LLM)."
+    )
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="JSON file with corpus and labelled queries")
+    parser.add_argument("--chunk-size", type=int, default=200, help="words per chunk (chunk_text)")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--profile", default="float32", help="collection profile of the benchmark collection")
+    parser.add_argument("--no-hyde", action="store_true", help="call chatbot_response with use_hyde=False")
+    parser.add_argument("--no-hybrid", action="store_true", help="vector search only (HYBRID_SEARCH=false)")
+    parser.add_argument("--repeats", type=int, default=5, help="passes over the query set per measurement")
+    parser.add_argument("--concurrency", type=int, default=1, help="concurrent callers")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="simulated LLM response time")
+    parser.add_argument("--skip-chat", action="store_true", help="only benchmark search_chunks")
+    parser.add_argument("--output", default=None, help="write the JSON results to this path")
+    parser.add_argument("--compare", default=None, help="previous results file to diff against")
+    return parser.parse_args()
+
+
+def configure_environment(args, work_dir: str):
+    """
+    Point every setting at local stand-ins. Must run before any app module
+    is imported, since they read their configuration at import time.
+    """
+    os.environ.update(
+        {
+            "DATA_DIR": work_dir,
+            "DATABASE_URL": f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}",
+            "EMBEDDING_PROVIDER": "local",
+            "EMBEDDING_CACHE_ENABLED": "false",
+            "VECTOR_BACKEND": "qdrant",
+            "LOCAL_INDEX_FALLBACK": "false",
+            "COLLECTION_PROFILE": args.profile,
+            "HYBRID_SEARCH": "false" if args.no_hybrid else "true",
+            # Caches would turn repeated passes into lookups
+            "SEMANTIC_CACHE_ENABLED": "false",
+            "HYDE_CACHE_ENABLED": "false",
+        }
+    )
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+
+class StubCompletions:
+    """
+    Stands in for `client.chat.completions`: echoes the last user message
+    after an optional fixed delay, so the chat path is measured without
+    network calls.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, model=None, messages=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        content = next((m["content"] for m in reversed(messages or []) if m["role"] == "user"), "")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"Stub answer. {content[:200]}"))]
+        )
+
+
+def load_fixture(path: str):
+    with open(path) as f:
+        fixture = json.load(f)
+    return fixture["corpus"], fixture["queries"]
+
+
+def build_corpus(corpus, chunk_size: int):
+    """
+    Chunk, index and embed the corpus into the in-memory collection.
+    """
+    from app.scraping.preprocess import chunk_text
+    from app.services.embeddings import embed_texts
+    from app.vector_db.bm25_index import build_bm25_index
+    from app.vector_db.qdrant_client import COLLECTION_NAME, init_collection, upsert_chunks
+
+    started = time.perf_counter()
+    chunks = [chunk for page in corpus for chunk in chunk_text(page, chunk_size=chunk_size)]
+    build_bm25_index(chunks)
+    embeddings = embed_texts([c["content"] for c in chunks])
+    init_collection(len(embeddings[0]), os.environ["COLLECTION_PROFILE"], COLLECTION_NAME)
+    result = upsert_chunks(chunks, embeddings)
+    return {
+        "pages": len(corpus),
+        "chunks": len(chunks),
+        "upserted": result["upserted"],
+        "vector_size": len(embeddings[0]),
+        "build_s": time.perf_counter() - started,
+    }
+
+
+def ranking_metrics(hits, relevant_urls, top_k: int):
+    """
+    recall@k over distinct relevant pages and reciprocal rank of the first
+    relevant page among the deduplicated hit urls.
+    """
+    from app.utils.urls import canonicalize_url
+
+    relevant = {canonicalize_url(u) for u in relevant_urls}
+    ranked = []
+    for hit in hits[:top_k]:
+        url = canonicalize_url(hit["url"])
+        if url not in ranked:
+            ranked.append(url)
+    found = relevant.intersection(ranked)
+    first = next((i for i, url in enumerate(ranked) if url in relevant), None)
+    return len(found) / len(relevant), 0.0 if first is None else 1.0 / (first + 1)
+
+
+def score_queries(queries, results, top_k: int):
+    """
+    Mean recall@k and MRR of one hit list per query against its gold urls.
+    """
+    per_query = []
+    for query, hits in zip(queries, results):
+        recall, rr = ranking_metrics(hits or [], query["relevant_urls"], top_k)
+        per_query.append({"query": query["query"], "recall_at_k": recall, "reciprocal_rank": rr})
+    return {
+        "recall_at_k": sum(q["recall_at_k"] for q in per_query) / len(per_query),
+        "mrr": sum(q["reciprocal_rank"] for q in per_query) / len(per_query),
+        "queries": per_query,
+    }
+
+
+def run_timed(call, items, repeats: int, concurrency: int):
+    """
+    Call `call(item)` for every item, `repeats` times over. Returns the
+    per-call latencies (seconds), the wall time and the last result per item.
+    """
+    work = [i for _ in range(repeats) for i in range(len(items))]
+    latencies = [0.0] * len(work)
+    results = [None] * len(items)
+
+    def timed(slot):
+        index = work[slot]
+        started = time.perf_counter()
+        results[index] = call(items[index])
+        latencies[slot] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(timed, range(len(work))))
+    else:
+        for slot in range(len(work)):
+            timed(slot)
+    return latencies, time.perf_counter() - started, results
+
+
+def latency_summary(latencies, wall_seconds: float):
+    ms = np.asarray(latencies) * 1000
+    return {
+        "calls": len(latencies),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "throughput_qps": len(latencies) / wall_seconds if wall_seconds else None,
+    }
+
+
+def benchmark_search(queries, args):
+    from app.vector_db.qdrant_client import search_chunks
+
+    texts = [q["query"] for q in queries]
+    # Warm-up pass (embedder, BM25 load) outside the measurement
+    for text in texts:
+        search_chunks(text, top_k=args.top_k)
+
+    latencies, wall, results = run_timed(
+        lambda text: search_chunks(text, top_k=args.top_k), texts, args.repeats, args.concurrency
+    )
+    scores = score_queries(queries, results, args.top_k)
+    return {
+        "recall_at_k": scores["recall_at_k"],
+        "mrr": scores["mrr"],
+        **latency_summary(latencies, wall),
+        "queries": scores["queries"],
+    }
+
+
+def benchmark_chat(queries, args, llm):
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+    from app.models.user import User
+    from app.models.chat_context import ChatContext  # noqa: F401 (registers tables)
+    from app.models.chat_summary import ChatSummary  # noqa: F401
+    from app.models.download import DownloadJob  # noqa: F401
+    import app.services.ai_chatbot as ai_chatbot
+
+    engine.echo = False
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(email="benchmark@example.com", hashed_password="-")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    local = threading.local()
+    retrieve = ai_chatbot._retrieve
+
+    def recording_retrieve(query, *rest, **kwargs):
+        # The hits the chat path actually put into the prompt
+        hits, hypothetical_answer = retrieve(query, *rest, **kwargs)
+        local.hits = hits
+        return hits, hypothetical_answer
+
+    def ask(text):
+        # Sessions are not thread safe; one per worker thread
+        if not hasattr(local, "db"):
+            local.db = SessionLocal()
+        local.hits = []
+        ai_chatbot.chatbot_response(text, user_id, local.db, top_k=args.top_k, use_hyde=not args.no_hyde)
+        return local.hits
+
+    texts = [q["query"] for q in queries]
+    llm.calls = 0
+    ai_chatbot._retrieve = recording_retrieve
+    try:
+        latencies, wall, results = run_timed(ask, texts, args.repeats, args.concurrency)
+    finally:
+        ai_chatbot._retrieve = retrieve
+    scores = score_queries(queries, results, args.top_k)
+    return {
+        "recall_at_k": scores["recall_at_k"],
+        "mrr": scores["mrr"],
+        # The stub LLM echoes its prompt, so HyDE searches with boilerplate text
+        "retrieval": "HyDE stubbed, hypothetical answers echo the prompt" if not args.no_hyde else "HyDE off",
+        **latency_summary(latencies, wall),
+        "llm_calls": llm.calls,
+        "llm_latency_ms": args.llm_latency_ms,
+        "queries": scores["queries"],
+    }
+
+
+def compare(results, previous):
+    print(f"\n🔁 Compared with {previous.get('run_at', 'previous run')}:")
+    for section, metric, higher_is_better in COMPARED_METRICS:
+        old = previous.get(section, {}).get(metric)
+        new = results.get(section, {}).get(metric)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        marker = "⚠️" if worse and abs(change) > 0.05 else "  "
+        print(f"{marker} {section}.{metric:15s} {old:10.3f} → {new:10.3f} ({change:+.1%})")
+
+
+def benchmark_retrieval():
+    args = parse_args()
+    work_dir = tempfile.mkdtemp(prefix="mosdac-benchmark-")
+    configure_environment(args, work_dir)
+    try:
+        run_benchmark(args)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_benchmark(args):
+
+    from qdrant_client import QdrantClient
+    import app.vector_db.qdrant_client as vector_db
+    import app.services.ai_chatbot as ai_chatbot
+    import app.services.conversation_memory as conversation_memory
+    from app.services.embeddings import embedding_provider
+
+    memory_qdrant = QdrantClient(":memory:")
+    vector_db.qdrant = memory_qdrant
+    vector_db.bulk_qdrant = memory_qdrant
+    llm = StubCompletions(args.llm_latency_ms)
+    stub_client = SimpleNamespace(chat=SimpleNamespace(completions=llm))
+    ai_chatbot.client = stub_client
+    conversation_memory.client = stub_client
+
+    corpus, queries = load_fixture(args.fixture)
+    print(f"📦 Loading {len(corpus)} pages into an in-memory collection...")
+    corpus_stats = build_corpus(corpus, args.chunk_size)
+    print(f"✅ {corpus_stats['chunks']} chunks indexed ({corpus_stats['build_s']:.2f}s)")
+
+    results = {
+        "run_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "fixture": os.path.basename(args.fixture),
+            "chunk_size": args.chunk_size,
+            "top_k": args.top_k,
+            "profile": args.profile,
+            "hybrid_search": not args.no_hybrid,
+            "use_hyde": not args.no_hyde,
+            "repeats": args.repeats,
+            "concurrency": args.concurrency,
+            "embedding_model": embedding_provider.model,
+            "queries": len(queries),
+        },
+        "corpus": corpus_stats,
+    }
+
+    print(f"\n🔎 search_chunks: {len(queries)} queries x {args.repeats}...")
+    results["search"] = benchmark_search(queries, args)
+    s = results["search"]
+    print(
+        f"📊 recall@{args.top_k} {s['recall_at_k']:.3f}, MRR {s['mrr']:.3f}, "
+        f"p50 {s['p50_ms']:.2f} ms, p95 {s['p95_ms']:.2f} ms, p99 {s['p99_ms']:.2f} ms, "
+        f"{s['throughput_qps']:.1f} q/s"
+    )
+
+    if not args.skip_chat:
+        print(f"\n💬 chatbot_response: {len(queries)} queries x {args.repeats}...")
+        results["chat"] = benchmark_chat(queries, args, llm)
+        c = results["chat"]
+        print(
+            f"📊 recall@{args.top_k} {c['recall_at_k']:.3f}, MRR {c['mrr']:.3f} ({c['retrieval']}), "
+            f"p50 {c['p50_ms']:.2f} ms, p95 {c['p95_ms']:.2f} ms, p99 {c['p99_ms']:.2f} ms, "
+            f"{c['throughput_qps']:.1f} q/s, {c['llm_calls']} LLM calls"
+        )
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📝 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    benchmark_retrieval()
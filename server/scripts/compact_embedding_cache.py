@@ -0,0 +1,38 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.embeddings import embedding_cache
+
+
+def compact_embedding_cache():
+    parser = argparse.ArgumentParser(
+        description="Evict stale entries from the embedding cache and reclaim their space."
+    )
+    parser.add_argument(
+        "--max-entries", type=int, default=None, help="keep at most this many (most recently used) entries"
+    )
+    parser.add_argument(
+        "--max-age-days", type=float, default=None, help="evict entries unused for this many days"
+    )
+    args = parser.parse_args()
+
+    before = embedding_cache.stats()
+    print(f"📦 Cache {before['model']}: {before['entries']} entries, {before['bytes'] / 1e6:.1f} MB")
+
+    result = embedding_cache.compact(
+        max_entries=args.max_entries,
+        max_age_seconds=args.max_age_days * 86400 if args.max_age_days is not None else None,
+    )
+
+    after = embedding_cache.stats()
+    print(
+        f"✅ Compacted: {result['entries_before']} → {result['entries_after']} entries, "
+        f"{after['bytes'] / 1e6:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    compact_embedding_cache()
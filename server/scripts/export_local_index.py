@@ -0,0 +1,25 @@
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.embeddings import embedding_provider
+from app.vector_db.local_index import LOCAL_INDEX_DIR, export_snapshot
+from app.vector_db.qdrant_client import COLLECTION_NAME, qdrant, check_embedding_provider
+
+
+def export_local_index():
+    """
+    Snapshot the Qdrant collection into the local vector index used by
+    VECTOR_BACKEND=local and as the fallback when Qdrant is unreachable.
+    """
+    check_embedding_provider(COLLECTION_NAME)
+    print(f"📤 Exporting {COLLECTION_NAME} to {LOCAL_INDEX_DIR}...")
+    started = time.time()
+    export_snapshot(qdrant, COLLECTION_NAME, embedding_provider.model)
+    print(f"✅ Export finished in {time.time() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    export_local_index()
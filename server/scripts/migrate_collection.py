@@ -0,0 +1,165 @@
+import sys
+import os
+import json
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.vector_db.collection_profiles import (
+    COLLECTION_PROFILES,
+    estimate_memory,
+    get_profile,
+    search_params,
+)
+from app.vector_db.qdrant_client import (
+    COLLECTION_NAME,
+    qdrant,
+    check_embedding_provider,
+    check_ready,
+    cleanup_old_versions,
+    copy_collection,
+    create_next_version,
+    discard_version,
+    init_collection,
+    resolve_collection,
+    swap_alias,
+    wait_until_indexed,
+)
+
+
+def measure(collection_name: str, queries, truth, top_k: int, params):
+    """
+    Mean recall@k against `truth` and mean latency of searches with `params`.
+    """
+    recalls, latencies = [], []
+    for vector, expected in zip(queries, truth):
+        started = time.perf_counter()
+        hits = qdrant.search(
+            collection_name=collection_name,
+            query_vector=vector,
+            limit=top_k,
+            search_params=params,
+        )
+        latencies.append(time.perf_counter() - started)
+        recalls.append(len({hit.id for hit in hits} & expected) / max(len(expected), 1))
+    return {
+        "recall_at_k": sum(recalls) / len(recalls) if recalls else None,
+        "mean_latency_ms": 1000 * sum(latencies) / len(latencies) if latencies else None,
+    }
+
+
+def migrate_collection():
+    parser = argparse.ArgumentParser(
+        description="Rebuild a Qdrant collection under a collection profile and report memory and recall."
+    )
+    parser.add_argument("--profile", required=True, choices=list(COLLECTION_PROFILES))
+    parser.add_argument("--source", default=COLLECTION_NAME)
+    parser.add_argument("--target", default=None, help="defaults to <source>_<profile>")
+    parser.add_argument(
+        "--replace",
+        action="store_true",
+        help=f"build the next {COLLECTION_NAME}_v<N> version and swap the {COLLECTION_NAME} alias onto it",
+    )
+    parser.add_argument("--sample-queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--report", default=None, help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    source, profile = resolve_collection(args.source), get_profile(args.profile)
+    check_embedding_provider(source)
+
+    info = qdrant.get_collection(source)
+    vector_size = info.config.params.vectors.size
+    total = qdrant.count(source, exact=True).count
+    print(f"📦 {source}: {total} points, {vector_size} dims")
+
+    if args.replace:
+        target = create_next_version(vector_size, args.profile)
+    else:
+        target = args.target or f"{source}_{args.profile}"
+        if qdrant.collection_exists(target):
+            qdrant.delete_collection(target)
+        init_collection(vector_size, args.profile, target)
+
+    # Reservoir-sample stored vectors to use as benchmark queries
+    sample, payload_bytes, seen = [], 0, 0
+
+    def on_batch(points):
+        nonlocal payload_bytes, seen
+        for point in points:
+            seen += 1
+            payload_bytes += len(json.dumps(point.payload))
+            if len(sample) < args.sample_queries:
+                sample.append((point.id, point.vector))
+            elif random.random() < args.sample_queries / seen:
+                sample[random.randrange(args.sample_queries)] = (point.id, point.vector)
+
+    started = time.time()
+    copied = copy_collection(source, target, args.batch_size, on_batch)
+    print(f"✅ Copied {copied} points into {target} ({time.time() - started:.1f}s)")
+    wait_until_indexed(target)
+    vectors = [vector for _, vector in sample]
+
+    # Ground truth: exact (brute-force) float32 search on the source
+    truth = [
+        {
+            hit.id
+            for hit in qdrant.search(
+                collection_name=source,
+                query_vector=vector,
+                limit=args.top_k,
+                search_params=search_params(get_profile("float32"), exact=True),
+            )
+        }
+        for vector in vectors
+    ]
+    baseline = get_profile("float32")
+    report = {
+        "source": source,
+        "target": target,
+        "profile": profile,
+        "points": copied,
+        "vector_size": vector_size,
+        "top_k": args.top_k,
+        "queries": len(vectors),
+        "baseline": {
+            **estimate_memory(baseline, copied, vector_size, payload_bytes),
+            **measure(source, vectors, truth, args.top_k, search_params(baseline)),
+        },
+        "migrated": {
+            **estimate_memory(profile, copied, vector_size, payload_bytes),
+            **measure(target, vectors, truth, args.top_k, search_params(profile)),
+        },
+    }
+
+    for name in ("baseline", "migrated"):
+        r = report[name]
+        print(
+            f"📊 {name:9s} RAM ~{r['ram_bytes'] / 1e6:.1f} MB, disk ~{r['disk_bytes'] / 1e6:.1f} MB, "
+            f"recall@{args.top_k} {r['recall_at_k'] or 0:.3f}, {r['mean_latency_ms'] or 0:.2f} ms/query"
+        )
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.report}")
+
+    if args.replace:
+        # Same readiness gate as the scraper before the alias moves
+        ready, readiness = check_ready(target, total, sample)
+        print(
+            f"🔎 {readiness['points']}/{readiness['expected_points']} points, "
+            f"sample recall {readiness['sample_recall']:.0%}, status {readiness['status']}"
+        )
+        if not ready:
+            print(f"❌ {target} is not ready; {COLLECTION_NAME} was left unchanged")
+            discard_version(target)
+            return
+        swap_alias(target)
+        cleanup_old_versions()
+        print(f"✅ {COLLECTION_NAME} now uses profile {args.profile}; set COLLECTION_PROFILE={args.profile}")
+
+if __name__ == "__main__":
+    migrate_collection()
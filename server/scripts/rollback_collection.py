@@ -0,0 +1,44 @@
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.vector_db.qdrant_client import (
+    COLLECTION_NAME,
+    list_versions,
+    resolve_collection,
+    swap_alias,
+    versioned_name,
+)
+
+
+def rollback_collection():
+    parser = argparse.ArgumentParser(
+        description=f"Point the {COLLECTION_NAME} alias back at an earlier collection version."
+    )
+    parser.add_argument("--version", type=int, default=None, help="defaults to the version before the live one")
+    args = parser.parse_args()
+
+    live = resolve_collection(COLLECTION_NAME)
+    versions = list_versions()
+    print(f"📁 Live: {live}; available versions: {', '.join(map(str, versions)) or 'none'}")
+
+    if args.version is not None:
+        version = args.version
+    else:
+        live_version = int(live.rsplit("_v", 1)[1]) if live.startswith(f"{COLLECTION_NAME}_v") else None
+        older = [v for v in versions if live_version is not None and v < live_version]
+        if not older:
+            print("❌ No earlier version to roll back to")
+            return
+        version = older[-1]
+
+    if version not in versions:
+        print(f"❌ Version {version} does not exist")
+        return
+    swap_alias(versioned_name(version))
+
+
+if __name__ == "__main__":
+    rollback_collection()
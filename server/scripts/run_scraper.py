@@ -1,33 +1,176 @@
 import sys
 import os
 import time
+import random
+import shutil
+import argparse
 from tqdm import tqdm
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.scraping.crawler import crawl_website
+from app.scraping.crawler import crawl_changes
+from app.scraping.crawl_state import CrawlState
 from app.scraping.scraper import extract_text_from_url
 from app.scraping.preprocess import chunk_text
-from app.services.embeddings import embed_texts
-from app.vector_db.qdrant_client import init_collection, upsert_chunks
+from app.utils.urls import canonicalize_url
+from app.services.embeddings import embed_texts, embedding_cache, embedding_provider
+from app.vector_db.qdrant_client import (
+    COLLECTION_NAME,
+    LOCAL_INDEX_FALLBACK,
+    VECTOR_BACKEND,
+    check_ready,
+    chunk_payload,
+    chunk_point_id,
+    cleanup_old_versions,
+    create_next_version,
+    discard_version,
+    load_indexed_chunks,
+    mark_index_updated,
+    qdrant,
+    swap_alias,
+    upsert_chunks,
+)
+from app.vector_db.local_index import LOCAL_INDEX_DIR, build_local_index, get_local_index
+from app.vector_db.bm25_index import BM25_DIR, build_bm25_index
+from app.utils.storage import replace_dir
+
+# The BM25 and local indexes are built here and only moved into place once
+# the new vector index is live, so all indexes change together
+BM25_STAGED_DIR = f"{BM25_DIR}.staged"
+LOCAL_INDEX_STAGED_DIR = f"{LOCAL_INDEX_DIR}.staged"
+STAGED_DIRS = {BM25_STAGED_DIR: BM25_DIR, LOCAL_INDEX_STAGED_DIR: LOCAL_INDEX_DIR}
+
+
+def store_in_qdrant(all_chunks, embeddings) -> bool:
+    """
+    Blue/green load: build a new mosdac_chunks_v<N> next to the live one,
+    check it, then atomically move the mosdac_chunks alias onto it.
+    """
+    # create the next collection version
+    print("\n🗄️ Initializing vector database...")
+    try:
+        vector_size = len(embeddings[0])
+        target = create_next_version(vector_size)
+        print(f"✅ Collection {target} initialized with vector size: {vector_size}")
+    except Exception as e:
+        print(f"❌ Collection initialization failed: {e}")
+        return False
+
+    # store in the new version while queries keep using the live one
+    print(f"\n💾 Storing chunks in {target}...")
+    db_start = time.time()
+
+    try:
+        result = upsert_chunks(all_chunks, embeddings, collection_name=target)
+        db_time = time.time() - db_start
+        print(
+            f"✅ Stored {result['upserted']}/{len(all_chunks)} chunks in database ({db_time:.2f}s)"
+        )
+    except Exception as e:
+        print(f"❌ Database storage failed: {e}")
+        discard_version(target)
+        return False
+
+    # readiness check, then swap the alias
+    print("\n🔎 Checking new collection before going live...")
+    try:
+        sample = random.sample(range(len(all_chunks)), min(20, len(all_chunks)))
+        point_ids = [
+            chunk_point_id(p["url"], p["chunk_id"], p["content"])
+            for p in (chunk_payload(all_chunks[i], i) for i in sample)
+        ]
+        ready, report = check_ready(
+            target, len(all_chunks), list(zip(point_ids, (embeddings[i] for i in sample)))
+        )
+        print(
+            f"📊 {report['points']}/{report['expected_points']} points, "
+            f"sample recall {report['sample_recall']:.0%}, status {report['status']}"
+        )
+        if not ready:
+            print(f"❌ {target} is not ready; {COLLECTION_NAME} was left unchanged")
+            discard_version(target)
+            return False
+        swap_alias(target)
+    except Exception as e:
+        print(f"❌ Collection swap failed: {e}")
+        discard_version(target)
+        return False
+
+    try:
+        cleanup_old_versions()
+    except Exception as e:
+        print(f"⚠️ Dropping old collection versions failed: {e}")
+
+    return True
+
+
+def promote_staged_indexes():
+    for staged, live in STAGED_DIRS.items():
+        if os.path.exists(staged):
+            replace_dir(staged, live)
+
+
+def discard_staged_indexes():
+    for staged in STAGED_DIRS:
+        shutil.rmtree(staged, ignore_errors=True)
+
+
+def live_index_size():
+    """
+    Number of chunks in the live index, None if it cannot be determined.
+    """
+    try:
+        if VECTOR_BACKEND == "local":
+            index = get_local_index(embedding_provider.model)
+            return index.meta["count"] if index else None
+        return qdrant.count(COLLECTION_NAME, exact=True).count
+    except Exception:
+        return None
 
 
 def run_scrapper():
+    parser = argparse.ArgumentParser(description="Crawl MOSDAC and (re)build the search indexes.")
+    parser.add_argument(
+        "--full", action="store_true", help="forget page validators and re-scrape every page"
+    )
+    parser.add_argument(
+        "--no-resume", action="store_true", help="start a new crawl instead of resuming an interrupted one"
+    )
+    args = parser.parse_args()
+
     base_url = "https://www.mosdac.gov.in"
     print(f"Starting scraper on {base_url}...\n")
 
     start_time = time.time()
+    state = CrawlState()
+    if args.full:
+        state.reset()
 
-    # crawl website for URLs
+    # crawl website for URLs (conditional GETs for pages indexed before)
     print("🔍 Crawling website for URLs...")
-    urls = crawl_website(base_url)
-    print(f"Found {len(urls)} URLs to scrape\n")
+    urls, unchanged = crawl_changes(base_url, state, resume=not args.no_resume)
+    print(f"Found {len(urls)} URLs, {len(unchanged)} unchanged since the last run\n")
+
+    # reuse the stored chunks and vectors of unchanged pages
+    carried_chunks, carried_embeddings = [], []
+    if unchanged:
+        try:
+            carried_chunks, carried_embeddings = load_indexed_chunks(unchanged)
+            print(f"♻️ Reusing {len(carried_chunks)} indexed chunks of unchanged pages")
+        except Exception as e:
+            print(f"⚠️ Could not load indexed chunks, re-scraping unchanged pages: {e}")
+    carried_urls = {c["url"] for c in carried_chunks}
+    to_scrape = [u for u in urls if canonicalize_url(u) not in carried_urls]
 
-    # scrape and chunk content
+    if not to_scrape and carried_chunks and live_index_size() == len(carried_chunks):
+        print("✅ No page changed since the last run; index left as is")
+        return
+
+    # scrape and chunk changed content
     all_chunks = []
     successful_urls = 0
 
-    for url in tqdm(urls, desc="Scraping pages", unit="page"):
+    for url in tqdm(to_scrape, desc="Scraping pages", unit="page"):
         url_start = time.time()
         page_data = extract_text_from_url(url)
 
@@ -45,56 +188,75 @@ def run_scrapper():
 
     scraping_time = time.time() - start_time
     print(
-        f"\n📊 Scraping completed: {successful_urls}/{len(urls)} pages, {len(all_chunks)} chunks in {scraping_time:.2f}s"
+        f"\n📊 Scraping completed: {successful_urls}/{len(to_scrape)} pages, {len(all_chunks)} chunks in {scraping_time:.2f}s"
     )
 
+    new_chunks = all_chunks
+    all_chunks = carried_chunks + new_chunks
     if not all_chunks:
         print("❌ No content scraped. Exiting.")
         return
 
+    # build the lexical index (staged until the vector index is live)
+    discard_staged_indexes()
+    print("\n📚 Building BM25 lexical index...")
+    try:
+        build_bm25_index(all_chunks, BM25_STAGED_DIR)
+    except Exception as e:
+        print(f"⚠️ BM25 index build failed: {e}")
+
     # generate embeddings
     print("\n🧠 Generating embeddings...")
     embedding_start = time.time()
 
-    texts = [c["content"] for c in all_chunks]
+    texts = [c["content"] for c in new_chunks]
 
     try:
-        embeddings = embed_texts(texts)
+        embeddings = carried_embeddings + (embed_texts(texts) if texts else [])
         embedding_time = time.time() - embedding_start
-        print(f"✅ Generated {len(embeddings)} embeddings in {embedding_time:.2f}s")
+        print(f"✅ Generated {len(texts)} embeddings in {embedding_time:.2f}s")
+        cache = embedding_cache.stats()
+        print(
+            f"♻️ Embedding cache: {cache['hits']} reused, {cache['misses']} embedded "
+            f"(hit rate {cache['hit_rate']:.0%})"
+        )
     except Exception as e:
         print(f"❌ Embedding generation failed: {e}")
+        discard_staged_indexes()
         return
 
-    # initialize qdrant collection
-    print("\n🗄️ Initializing vector database...")
-    try:
-        vector_size = len(embeddings[0])
-        init_collection(vector_size)
-        print(f"✅ Collection initialized with vector size: {vector_size}")
-    except Exception as e:
-        print(f"❌ Collection initialization failed: {e}")
-        return
-
-    # store in qdrant
-    print("\n💾 Storing chunks in vector database...")
-    db_start = time.time()
+    # write the local vector index (primary store with VECTOR_BACKEND=local,
+    # otherwise the fallback used when Qdrant is unreachable)
+    stored = False
+    if VECTOR_BACKEND == "local" or LOCAL_INDEX_FALLBACK:
+        print("\n📦 Writing local vector index...")
+        try:
+            build_local_index(
+                [chunk_payload(c, i) for i, c in enumerate(all_chunks)],
+                embeddings,
+                embedding_provider.model,
+                LOCAL_INDEX_STAGED_DIR,
+            )
+            stored = VECTOR_BACKEND == "local"
+        except Exception as e:
+            print(f"⚠️ Local vector index build failed: {e}")
 
-    try:
-        upsert_chunks(all_chunks, embeddings)
-        db_time = time.time() - db_start
-        print(
-            f"✅ Successfully stored {len(all_chunks)} chunks in database ({db_time:.2f}s)"
-        )
-    except Exception as e:
-        print(f"❌ Database storage failed: {e}")
+    if VECTOR_BACKEND != "local":
+        stored = store_in_qdrant(all_chunks, embeddings)
+    if not stored:
+        discard_staged_indexes()
         return
+    promote_staged_indexes()
+    if VECTOR_BACKEND == "local":
+        mark_index_updated()
+    # only now are the fetched page versions re-fetched conditionally
+    state.mark_indexed({c["url"] for c in all_chunks})
 
     # final summary
     total_time = time.time() - start_time
     print(f"\n🎉 Pipeline completed successfully!")
     print(f"⏱️  Total time: {total_time:.2f}s")
-    print(f"📄 Pages processed: {successful_urls}/{len(urls)}")
+    print(f"📄 Pages processed: {successful_urls}/{len(to_scrape)} scraped, {len(carried_urls)} unchanged")
     print(f"🧩 Total chunks: {len(all_chunks)}")
     print(f"🔢 Vector dimensions: {len(embeddings[0])}")
 
@@ -0,0 +1,15 @@
+import os
+import sys
+import tempfile
+
+# The app reads its configuration at import time; point it at throwaway
+# local state so the tests need no API keys, Postgres or Qdrant
+_data_dir = tempfile.mkdtemp(prefix="mosdac-tests-")
+os.environ.setdefault("DATA_DIR", _data_dir)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_data_dir, 'test.db')}")
+os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+os.environ.setdefault("VECTOR_BACKEND", "local")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
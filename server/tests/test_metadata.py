@@ -0,0 +1,30 @@
+import pytest
+from app.scraping.metadata import detect_filters, extract_metadata, find_missions
+
+
+@pytest.mark.parametrize(
+    "text, missions",
+    [
+        ("SCATSAT wind vectors", ["SCATSAT-1"]),
+        ("scatsat-1 level 2 winds", ["SCATSAT-1"]),
+        ("Scatsat data download", ["SCATSAT-1"]),
+        ("INSAT-3DR imager", ["INSAT-3DR"]),
+        ("3DR and 3DS sounder products", ["INSAT-3DR", "INSAT-3DS"]),
+        ("Kalpana VHRR archive", ["KALPANA-1"]),
+        ("Megha rainfall", ["MEGHA-TROPIQUES"]),
+        ("OS-3 ocean colour", ["OCEANSAT-3"]),
+    ],
+)
+def test_find_missions_accepts_short_forms(text, missions):
+    assert find_missions(text) == missions
+
+
+def test_ambiguous_short_forms_are_not_guessed():
+    assert find_missions("oceansat chlorophyll") == []
+    assert find_missions("insat-3d imager") == ["INSAT-3D"]
+
+
+def test_short_form_sets_filter_and_metadata():
+    assert detect_filters("What is the resolution of Scatsat winds?") == {"mission": ["SCATSAT-1"]}
+    metadata = extract_metadata("https://www.mosdac.gov.in/scatsat", "Scatsat", "Scatterometer winds")
+    assert metadata["mission"] == ["SCATSAT-1"]
@@ -0,0 +1,65 @@
+import pytest
+from app.services import ai_chatbot
+from app.services.semantic_cache import SemanticCache, is_self_contained
+
+HITS = [{"url": "https://www.mosdac.gov.in/insat-3d", "title": "INSAT-3D", "chunk_id": 0, "content": "INSAT-3D imager", "score": 0.9}]
+
+
+@pytest.fixture
+def chatbot(monkeypatch):
+    calls = {"complete": 0, "conversation": 0}
+
+    def load_conversation(db, user_id):
+        calls["conversation"] += 1
+        return f"summary of user {user_id}", [f"earlier message of user {user_id}"]
+
+    def complete(messages):
+        calls["complete"] += 1
+        return f"answer {calls['complete']}"
+
+    monkeypatch.setattr(ai_chatbot, "SEMANTIC_CACHE_ENABLED", True)
+    monkeypatch.setattr(ai_chatbot, "semantic_cache", SemanticCache())
+    monkeypatch.setattr(ai_chatbot, "embed_texts", lambda texts: [[1.0, 0.5, 0.25] for _ in texts])
+    monkeypatch.setattr(ai_chatbot, "_retrieve", lambda *args: (HITS, None))
+    monkeypatch.setattr(ai_chatbot, "build_enhanced_prompt", lambda *args, **kwargs: [])
+    monkeypatch.setattr(ai_chatbot, "complete", complete)
+    monkeypatch.setattr(ai_chatbot, "load_conversation", load_conversation)
+    monkeypatch.setattr(ai_chatbot, "save_exchange", lambda *args: None)
+    return calls
+
+
+def ask(query, user_id):
+    return ai_chatbot._rag_response(query, user_id, None, top_k=5, use_hyde=False)
+
+
+def test_users_with_history_share_self_contained_answers(chatbot):
+    first = ask("What is the spatial resolution of the INSAT-3D imager?", user_id=1)
+    second = ask("What is the spatial resolution of the INSAT-3D imager?", user_id=2)
+
+    assert second == first
+    assert chatbot["complete"] == 1
+    # Cache-eligible answers are built without anyone's conversation
+    assert chatbot["conversation"] == 0
+    assert ai_chatbot.semantic_cache.stats()["hits"] == 1
+
+
+def test_follow_up_questions_bypass_the_cache(chatbot):
+    ask("What about its resolution?", user_id=1)
+    ask("What about its resolution?", user_id=2)
+
+    assert chatbot["complete"] == 2
+    assert chatbot["conversation"] == 2
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("How do I download SST data from MOSDAC?", True),
+        ("Which sensors does SCATSAT-1 carry", True),
+        ("And for Oceansat-2?", False),
+        ("Tell me more", False),
+        ("Is that product available in HDF5?", False),
+    ],
+)
+def test_is_self_contained(query, expected):
+    assert is_self_contained(query) is expected